@@ -0,0 +1,425 @@
+"""
+Benchmarks for the Temperature class
+
+python bench_temperature.py                          run every benchmark, print a table
+python bench_temperature.py -o results.json          also save the results as JSON
+python bench_temperature.py -b baseline.json         compare against saved results, exit 1 on regressions
+python bench_temperature.py -k sort --sizes 1000     only benchmarks whose name contains "sort"
+"""
+import argparse
+import cPickle
+import itertools
+import json
+import operator
+import platform
+import random
+import sys
+import time
+import timeit
+
+import temperature
+from temperature import Temperature
+from temperature_fixed import FixedTemperature
+from temperature_io import TemperatureFormatter
+from temperature_stats import QuantileSketch
+from temperature_store import pack_batch, unpack_batch
+
+
+def mixed_temperatures(n, seed=1):
+    """
+    returns n Temperature objects with random values in random scales
+    """
+    rnd = random.Random(seed)
+    return [Temperature(str(rnd.randint(-200, 300)) + rnd.choice("CFK")) for _ in xrange(n)]
+
+
+def fresh(temps):
+    """
+    uncached copies of temps: Temperatures memoize their Kelvin key and dvalue, so timing the same
+    objects over and over only measures cache hits; the cold benchmarks time operations on fresh() copies
+    """
+    from_fields = Temperature._from_fields
+    return [from_fields(t.value, t.scale, t.dscale) for t in temps]
+
+
+class DictTemperature(Temperature):
+    """
+    Temperature with its three attributes also held in a per-instance __dict__,
+    modelling the layout before Temperature used __slots__
+    """
+
+    def __init__(self, value=None):
+        Temperature.__init__(self, value)
+        self.__dict__.update(value=self.value, scale=self.scale, dscale=self.dscale)
+
+
+def instance_bytes(t):
+    """
+    bytes held by a Temperature instance and its __dict__, if it has one
+    """
+    size = sys.getsizeof(t)
+    if hasattr(t, "__dict__"):
+        size += sys.getsizeof(t.__dict__)
+    return size
+
+
+def bench_memory(n):
+    """
+    returns {class name: (bytes per instance, seconds to construct n instances from "10.5f")}
+    """
+    results = {}
+    for cls in (Temperature, DictTemperature):
+        t = cls("10.5f")
+        t.dscale = "k"
+        seconds = min(timeit.repeat(lambda: cls("10.5f"), number=n, repeat=3))
+        results[cls.__name__] = (instance_bytes(t), seconds)
+    return results
+
+
+class DefaultPickleTemperature(Temperature):
+    """
+    Temperature pickled the default way, its slots as a state dict, as before it defined __reduce__
+    """
+    __slots__ = ()
+    __reduce__ = object.__reduce__
+
+
+def _serializable(n, how):
+    temps = mixed_temperatures(n)
+    if how == "default":
+        return [DefaultPickleTemperature._from_fields(t.value, t.scale, t.dscale) for t in temps]
+    return temps
+
+
+def _serialized(temps, how):
+    return pack_batch(temps) if how == "batch" else cPickle.dumps(temps, 2)
+
+
+def bench_serialization(n):
+    """
+    returns {"default pickle", "pickle" or "batch": bytes per reading} for n mixed-scale Temperatures
+    """
+    return dict((name, len(_serialized(_serializable(n, how), how)) / float(n))
+                for name, how in [("default pickle", "default"), ("pickle", "pickle"), ("batch", "batch")])
+
+
+# Each benchmark is (name, setup, ops). setup() builds the inputs outside the timed region
+# and returns the function to time; one call of that function performs ops operations.
+
+def _construct(value):
+    return lambda: lambda: Temperature(value)
+
+
+def _convert(from_, to):
+    def setup():
+        func = getattr(Temperature, from_ + "2" + to)
+        return lambda: func(37.5)
+    return setup
+
+
+def _convert_table(from_, to):
+    """
+    a conversion as the Temperature machinery dispatches it, C/F/K x2y functions and registered scales alike
+    """
+    def setup():
+        func = temperature._CONVERSIONS[(from_, to)]
+        return lambda: func(37.5)
+    return setup
+
+
+def _from_fields():
+    """
+    the cost of the copy the cold benchmarks make
+    """
+    return lambda: Temperature._from_fields(37.5, "C", "F")
+
+
+def _dvalue(cold=False):
+    def setup():
+        t = Temperature("37.5c")
+        t.dscale = "f"
+        if cold:
+            return lambda: Temperature._from_fields(37.5, "C", "F").dvalue
+        return lambda: t.dvalue
+    return setup
+
+
+def _str(cold=False):
+    def setup():
+        t = Temperature("37.5c")
+        t.dscale = "f"
+        if cold:
+            return lambda: str(Temperature._from_fields(37.5, "C", "F"))
+        return lambda: str(t)
+    return setup
+
+
+def _arithmetic(op):
+    def setup():
+        t1 = Temperature("37.5c")
+        t2 = Temperature("99.5f")
+        if op == "+":
+            return lambda: t1 + t2
+        return lambda: t1 - t2
+    return setup
+
+
+def _compare(op, cold=False):
+    def setup():
+        t1 = Temperature("37.5c")
+        t2 = Temperature("99.5f")
+        if cold:
+            compare = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+                       ">": operator.gt, ">=": operator.ge}[op]
+            from_fields = Temperature._from_fields
+            return lambda: compare(from_fields(37.5, "C", "C"), from_fields(99.5, "F", "F"))
+        return {
+            "==": lambda: t1 == t2,
+            "!=": lambda: t1 != t2,
+            "<": lambda: t1 < t2,
+            "<=": lambda: t1 <= t2,
+            ">": lambda: t1 > t2,
+            ">=": lambda: t1 >= t2,
+        }[op]
+    return setup
+
+
+def _sort(n, key=None, cold=False):
+    def setup():
+        temps = mixed_temperatures(n)
+        if cold:
+            return lambda: sorted(fresh(temps), key=key)
+        return lambda: sorted(temps, key=key)
+    return setup
+
+
+def _sum(n, fold=False):
+    def setup():
+        temps = mixed_temperatures(n)
+        if fold:
+            return lambda: reduce(operator.add, temps)
+        return lambda: Temperature.sum(temps)
+    return setup
+
+
+def _quantiles(n, sketch=False, cold=False):
+    """
+    p50, p95 and p99 of n mixed-scale Temperatures, exactly by sorting or with a QuantileSketch
+    """
+    def setup():
+        temps = mixed_temperatures(n)
+        copy = fresh if cold else list
+        if sketch:
+            return lambda: QuantileSketch(copy(temps)).quantiles([0.5, 0.95, 0.99])
+        def exact():
+            ordered = sorted(copy(temps), key=Temperature.sort_key)
+            return [ordered[min(int(q * n), n - 1)] for q in (0.5, 0.95, 0.99)]
+        return exact
+    return setup
+
+
+def _format(n, bulk=False):
+    """
+    renders n mixed-scale Temperatures as text, with str() or a TemperatureFormatter
+    """
+    def setup():
+        temps = mixed_temperatures(n)
+        for t, dscale in zip(temps, itertools.cycle("CFK")):
+            t.dscale = dscale
+        if bulk:
+            formatter = TemperatureFormatter()
+            return lambda: formatter.write(temps, NullFile())
+        return lambda: "".join([str(t) + "\n" for t in temps])
+    return setup
+
+
+class NullFile(object):
+    def write(self, data):
+        pass
+
+
+def _serialize(n, how, load=False):
+    """
+    encodes, or with load decodes, n mixed-scale Temperatures: how is "default" (pickle without
+    __reduce__), "pickle" or "batch" (pack_batch)
+    """
+    def setup():
+        temps = _serializable(n, how)
+        if not load:
+            return lambda: _serialized(temps, how)
+        data = _serialized(temps, how)
+        return lambda: unpack_batch(data) if how == "batch" else cPickle.loads(data)
+    return setup
+
+
+# the fixed-point counterparts of construct.str_suffixed, arith.*_mixed, compare.* and sort
+def _fixed(op):
+    def setup():
+        t1 = FixedTemperature("37.5c")
+        t2 = FixedTemperature("99.5f")
+        return {
+            "construct": lambda: FixedTemperature("37.5f"),
+            "+": lambda: t1 + t2,
+            "-": lambda: t1 - t2,
+            "==": lambda: t1 == t2,
+            "<": lambda: t1 < t2,
+            "str": lambda: str(t2),
+        }[op]
+    return setup
+
+
+def _fixed_sort(n):
+    def setup():
+        temps = [FixedTemperature(t.value, t.scale) for t in mixed_temperatures(n)]
+        return lambda: sorted(temps)
+    return setup
+
+
+def benchmarks(sizes):
+    """
+    returns the list of (name, setup, ops) benchmarks, sorting and summing at each of sizes
+    """
+    result = [
+        ("construct.none", _construct(None), 1),
+        ("construct.int", _construct(37), 1),
+        ("construct.float", _construct(37.5), 1),
+        ("construct.str_int", _construct("37"), 1),
+        ("construct.str_float", _construct("37.5"), 1),
+        ("construct.str_suffixed", _construct("37.5f"), 1),
+    ]
+    for from_ in "cfk":
+        for to in "cfk":
+            result.append(("convert.{0}2{1}".format(from_, to), _convert(from_, to), 1))
+    for from_, to in [("C", "F"), ("F", "K"), ("K", "R"), ("R", "N"), ("D", "F")]:
+        result.append(("convert.table.{0}2{1}".format(from_, to).lower(), _convert_table(from_, to), 1))
+    result.append(("construct.from_fields", _from_fields, 1))
+    result.append(("dvalue", _dvalue(), 1))
+    result.append(("dvalue.cold", _dvalue(cold=True), 1))
+    result.append(("str", _str(), 1))
+    result.append(("str.cold", _str(cold=True), 1))
+    result.append(("arith.add_mixed", _arithmetic("+"), 1))
+    result.append(("arith.sub_mixed", _arithmetic("-"), 1))
+    for op, name in [("==", "eq"), ("!=", "ne"), ("<", "lt"), ("<=", "le"), (">", "gt"), (">=", "ge")]:
+        result.append(("compare." + name, _compare(op), 1))
+        result.append(("compare.cold." + name, _compare(op, cold=True), 1))
+    for op, name in [("construct", "construct.str_suffixed"), ("+", "arith.add_mixed"), ("-", "arith.sub_mixed"),
+                     ("==", "compare.eq"), ("<", "compare.lt"), ("str", "str")]:
+        result.append(("fixed." + name, _fixed(op), 1))
+    for n in sizes:
+        result.append(("sort.{0}".format(n), _sort(n), n))
+        result.append(("sort.cold.{0}".format(n), _sort(n, cold=True), n))
+        result.append(("fixed.sort.{0}".format(n), _fixed_sort(n), n))
+        result.append(("sort_key.{0}".format(n), _sort(n, Temperature.sort_key), n))
+        result.append(("sum.reduce.{0}".format(n), _sum(n, fold=True), n))
+        result.append(("sum.{0}".format(n), _sum(n), n))
+        result.append(("quantile.sort.{0}".format(n), _quantiles(n), n))
+        result.append(("quantile.sort.cold.{0}".format(n), _quantiles(n, cold=True), n))
+        result.append(("format.str.{0}".format(n), _format(n), n))
+        for how in ("default", "pickle", "batch"):
+            result.append(("serialize.{0}.dumps.{1}".format(how, n), _serialize(n, how), n))
+            result.append(("serialize.{0}.loads.{1}".format(how, n), _serialize(n, how, load=True), n))
+        result.append(("format.bulk.{0}".format(n), _format(n, bulk=True), n))
+        result.append(("quantile.sketch.{0}".format(n), _quantiles(n, sketch=True), n))
+        result.append(("quantile.sketch.cold.{0}".format(n), _quantiles(n, sketch=True, cold=True), n))
+    return result
+
+
+def time_benchmark(setup, ops, min_seconds=0.2, repeat=3):
+    """
+    Returns the best seconds per operation over repeat runs.
+    Each run calls the benchmark enough times to last about min_seconds.
+    """
+    func = setup()
+    number = 1
+    while True:  # calibrate the number of calls per run
+        seconds = timeit.timeit(func, number=number)
+        if seconds >= min_seconds / 10 or number >= 1 << 30:
+            break
+        number *= 10
+    number = max(1, int(number * min_seconds / max(seconds, 1e-9)))
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number / ops
+
+
+def run(sizes=(1000, 10000, 100000), pattern=None, min_seconds=0.2, repeat=3, report=None):
+    """
+    runs the benchmarks whose name contains pattern, returns the results as a JSON-able dict
+    """
+    results = {}
+    for name, setup, ops in benchmarks(sizes):
+        if pattern and pattern not in name:
+            continue
+        results[name] = time_benchmark(setup, ops, min_seconds, repeat)
+        if report is not None:
+            report(name, results[name])
+    n = 1000
+    memory = bench_memory(n)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds_per_op": results,
+        "bytes_per_instance": dict((name, size) for name, (size, seconds) in memory.items()),
+        "construct_seconds": dict((name, seconds / n) for name, (size, seconds) in memory.items()),
+        "bytes_per_reading": bench_serialization(1000),
+    }
+
+
+def compare(current, baseline, threshold=0.1):
+    """
+    Returns [(name, baseline seconds, current seconds, ratio)] for the benchmarks
+    at least threshold (a fraction) slower than in baseline
+    """
+    regressions = []
+    old = baseline["seconds_per_op"]
+    for name, seconds in sorted(current["seconds_per_op"].items()):
+        if name in old and old[name] > 0:
+            ratio = seconds / old[name]
+            if ratio > 1 + threshold:
+                regressions.append((name, old[name], seconds, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Temperature class")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-b", "--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="slowdown, as a fraction, that counts as a regression (default 0.1)")
+    parser.add_argument("-k", "--pattern", help="only run benchmarks whose name contains this")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="input sizes for the sort and sum benchmarks")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum duration of each timing run")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per benchmark, the best is kept")
+    args = parser.parse_args(argv)
+
+    def report(name, seconds):
+        print "{0:<28}{1:>14.1f} ns/op".format(name, seconds * 1e9)
+
+    results = run(args.sizes, args.pattern, args.min_seconds, args.repeat, report)
+    for name, size in sorted(results["bytes_per_instance"].items()):
+        print "{0:<28}{1:>14} bytes/instance".format(name, size)
+    for name, seconds in sorted(results["construct_seconds"].items()):
+        print "{0:<28}{1:>14.1f} ns/construct".format(name, seconds * 1e9)
+    for name, size in sorted(results["bytes_per_reading"].items()):
+        print "{0:<28}{1:>14.1f} bytes/reading serialized".format(name, size)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print "REGRESSION {0}: {1:.1f} -> {2:.1f} ns/op ({3:.2f}x)".format(name, old * 1e9, new * 1e9, ratio)
+        if regressions:
+            return 1
+        print "no regressions against {0}".format(args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,178 @@
+import math
+import numbers
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from fractions import Fraction
+
+# The temperature string grammar, after stripping surrounding spaces:
+#   a bare number, anything int() or float() accepts, in the default scale
+#   an integer followed by a scale suffix, e.g. "10k", "-5 F"
+#   a float with a period followed by a scale suffix, e.g. "10.5f", "1.e3C"
+_INT = r"(?:[+-]\s*)?\d+"  # int() allows spaces between the sign and the digits
+_FLOAT = r"[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[iI][nN][fF](?:[iI][nN][iI][tT][yY])?|[nN][aA][nN])"
+_PERIOD_FLOAT = r"[+-]?(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def _temperature_re(scales):
+    """
+    compiles the grammar with the suffixes of scales, in either case
+    """
+    suffixes = "".join(re.escape(scale.lower() + scale) for scale in scales)
+    return re.compile(r"(?P<int>{0})\Z|(?P<float>{1})\Z|(?:(?P<sint>{0})|(?P<sfloat>{2}))\s*(?P<scale>[{3}])\Z"
+                      .format(_INT, _FLOAT, _PERIOD_FLOAT, suffixes))
+
+
+def _parse(value):
+    """
+    Parses a stripped temperature string without raising.
+    Returns (value, scale), scale is None for a bare number (default scale), or None if value is invalid
+    """
+    match = _TEMPERATURE_RE.match(value)
+    if match is None:
+        return None
+    kind = match.lastgroup
+    if kind == "int":
+        return int(value), None
+    if kind == "float":
+        return float(value), None
+    number = match.group("sint")
+    if number is not None:
+        return int(number), match.group("scale").upper()
+    return float(match.group("sfloat")), match.group("scale").upper()
+
+
+def _parse_error(value):
+    """
+    returns the ValueError describing why the stripped string value failed to parse
+    """
+    if len(value) == 0:  # empty string
+        return ValueError("Invalid init string. Example: '100C', '72F'")
+    if value[-1].upper() not in Temperature.SCALES:
+        return ValueError("Invalid temperature scale. Valid scales are : " + _scale_letters("'{0}'"))
+    return ValueError("Invalid temperature '{0}'".format(value[:-1]))
+
+
+def _scale_letters(quoted):
+    """
+    lists the scale suffixes in both cases, each formatted with quoted, e.g. "'c', 'C', 'f', 'F', ..."
+    """
+    return ", ".join(quoted.format(letter) for scale in Temperature.SCALES for letter in (scale.lower(), scale))
+
+
+def _check_scale(scale):
+    """
+    returns scale, a scale name in any case with optional spaces, as one of Temperature.SCALES.
+    Raises TypeError or ValueError like the scale setters
+    """
+    if not isinstance(scale, str):
+        raise TypeError("Temperature scale must be one of {0}".format(list(Temperature.SCALES)))
+    scale = scale.strip().upper()
+    if scale not in Temperature.SCALES:
+        raise ValueError("Temperature scale must be one of {0}".format(list(Temperature.SCALES)))
+    return scale
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class ParseCache(object):
+    """
+    Bounded LRU map from raw temperature strings to their parsed (value, scale).
+    Bare numbers are cached with scale None and take the default scale when used,
+    so the cache stays correct across set_default_scale. Invalid strings aren't cached.
+    """
+
+    def __init__(self, maxsize=1024):
+        if not isinstance(maxsize, int) or isinstance(maxsize, bool):
+            raise TypeError("maxsize must be an int")
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self.__lock = threading.Lock()
+        self.__entries = {}  # raw string -> [prev link, next link, raw string, parsed]
+        self.__root = root = []  # sentinel of the circular list, most recently used last
+        root[:] = [root, root, None, None]
+
+    def parse(self, raw):
+        """
+        returns _parse() of the stripped raw string, through the cache
+        """
+        with self.__lock:
+            link = self.__entries.get(raw)
+            if link is not None:  # move to the most recently used end
+                prev, next_, _, parsed = link
+                prev[1] = next_
+                next_[0] = prev
+                root = self.__root
+                last = root[0]
+                last[1] = root[0] = link
+                link[0] = last
+                link[1] = root
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        parsed = _parse(raw.strip())
+        if parsed is None:
+            return None
+
+        with self.__lock:
+            if raw in self.__entries:  # added by another thread meanwhile
+                return parsed
+            root = self.__root
+            if len(self.__entries) >= self.maxsize:  # evict the least recently used
+                oldest = root[1]
+                root[1] = oldest[1]
+                oldest[1][0] = root
+                del self.__entries[oldest[2]]
+                self.evictions += 1
+            last = root[0]
+            link = [last, root, raw, parsed]
+            last[1] = root[0] = self.__entries[raw] = link
+        return parsed
+
+    def info(self):
+        """
+        returns CacheInfo(hits, misses, evictions, maxsize, currsize)
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.__entries))
+
+    def clear(self):
+        """
+        empties the cache and resets its statistics
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__root[:] = [self.__root, self.__root, None, None]
+            self.hits = self.misses = self.evictions = 0
+
+
+_parse_cache = None  # the ParseCache used by the constructor and parse_many, None when disabled
+
+
+class _ScopedDefault(threading.local):
+    scale = None  # this thread's scoped_default_scale, None falls back to Temperature.DEFAULT_SCALE
+
+
+_scoped_default = _ScopedDefault()
+
+
 class Temperature(object):
     """
     Celsius: "c" or "C", this is the class default
     Fahrenheit: "f" or "F"
     Kelvin: "k" or "K"
+    Rankine: "r" or "R", Delisle: "d" or "D", Newton: "n" or "N"
+    More scales can be added with register_scale
     """
 
+    __slots__ = ("__value", "__scale", "__dscale", "__kelvin", "__dvalue")  # no per-instance __dict__, subclasses may add one back
+
     DEFAULT_SCALE = "C"
+    SCALES = ("C", "F", "K")  # a scale's code is its index in SCALES
 
     def __init__(self, value=None):
         """
@@ -18,44 +185,48 @@ class Temperature(object):
        """
         if value is None:  # default to 0 degree with default scale
             self.__value = 0
-            self.__scale = Temperature.DEFAULT_SCALE
+            self.__scale = _scoped_default.scale or Temperature.DEFAULT_SCALE
         elif isinstance(value, int) or isinstance(value, float):
             self.__value = value
-            self.__scale = Temperature.DEFAULT_SCALE
+            self.__scale = _scoped_default.scale or Temperature.DEFAULT_SCALE
         else:
             if not isinstance(value, str):
                 raise TypeError("Init value must be numeric or a valid temperature string. Example: '100C', '72F'")
-            value = value.strip()  # get rid of potential spaces
-            if len(value) == 0:  # empty string
-                raise ValueError("Invalid init string. Example: '100C', '72F'")
-
-            try:  # is this an integer
-                self.__value = int(value)
-                self.__scale = Temperature.DEFAULT_SCALE
-            except ValueError:
-                try:  # is this a float
-                    self.__value = float(value)
-                    self.__scale = Temperature.DEFAULT_SCALE
-                except ValueError:  # expecting a scale qualifier
-                    scale = value[-1]
-                    if scale not in ["c", "C", "f", "F", "k", "K"]:
-                        raise ValueError("Invalid temperature scale. Valid scales are : 'c', 'C', 'f', 'F', 'k', 'K'")
-
-                    temperature = value[:-1]
-                    if "." in temperature:  # there's a period, parse temperature as a float
-                        try:
-                            self.__value = float(temperature)
-                        except ValueError:
-                            raise ValueError("Invalid temperature '{0}'".format(temperature))
-                    else:  # no period, parse temperature as an int
-                        try:
-                            self.__value = int(temperature)
-                        except ValueError:
-                            raise ValueError("Invalid temperature '{0}'".format(temperature))
-
-                    self.__scale = scale.upper()
+            if _parse_cache is None:
+                parsed = _parse(value.strip())  # get rid of potential spaces
+            else:
+                parsed = _parse_cache.parse(value)
+            if parsed is None:
+                raise _parse_error(value.strip())
+            self.__value, scale = parsed
+            self.__scale = scale or _scoped_default.scale or Temperature.DEFAULT_SCALE
 
         self.__dscale = self.__scale  # display scale defaults to scale
+        self.__kelvin = None  # canonical Kelvin key, computed on first use
+        self.__dvalue = None  # value in dscale, computed on first use
+
+    @classmethod
+    def _from_fields(cls, value, scale, dscale):
+        """
+        builds a Temperature straight from already validated fields, skipping __init__
+        """
+        t = object.__new__(cls)
+        t.__value = value
+        t.__scale = scale
+        t.__dscale = dscale
+        t.__kelvin = None
+        t.__dvalue = None
+        return t
+
+    def __reduce__(self):
+        """
+        pickles just (class, value, scale), plus dscale when it differs, and a subclass's __dict__ if it has one
+        """
+        if self.__dscale == self.__scale:
+            fields = (self.__class__, self.__value, self.__scale)
+        else:
+            fields = (self.__class__, self.__value, self.__scale, self.__dscale)
+        return _unpickle, fields, getattr(self, "__dict__", None)
 
     def __str__(self):
         return "{0}{1}".format(self.dvalue, self.__dscale)
@@ -91,13 +262,7 @@ class Temperature(object):
             return new_t
 
         # adding 2 Temperatures objects with mixed scale, __scale & __dscale set to "K"
-        from_ = self.__scale.lower()
-        func = "Temperature." + from_ + "2k"
-        sum_ = eval(func)(self.__value)  # convert self to Kelvin
-        from_ = other.__scale.lower()
-        func = "Temperature." + from_ + "2k"
-        sum_ += eval(func)(other.__value)  # convert other to Kelvin and add
-        new_t.__value = sum_
+        new_t.__value = self.kelvin + other.kelvin
         new_t.__scale = new_t.__dscale = "K"
 
         return new_t
@@ -130,40 +295,51 @@ class Temperature(object):
             return new_t
 
         # adding 2 Temperatures objects with mixed scale, __scale & __dscale set to "K"
-        from_ = self.__scale.lower()
-        func = "Temperature." + from_ + "2k"
-        diff = eval(func)(self.__value)  # convert self to Kelvin
-        from_ = other.__scale.lower()
-        func = "Temperature." + from_ + "2k"
-        diff -= eval(func)(other.__value)  # convert other to Kelvin and subtract
-        new_t.__value = diff
+        new_t.__value = self.kelvin - other.kelvin
         new_t.__scale = new_t.__dscale = "K"
 
         return new_t
 
+    # the rich comparisons read the cached Kelvin key directly and only fall back to the
+    # kelvin property when it isn't cached yet (or is 0, which the property returns as is).
+    # Equality with anything but a Temperature is NotImplemented, so Python falls back to identity
+    # (which mixed dict keys need); ordering against it raises TypeError
     def __eq__(self, other):
-        left = "Temperature." + self.__scale.lower() + "2k"
-        right = "Temperature." + other.__scale.lower() + "2k"
-        return eval(left)(self.__value) == eval(right)(other.__value)
+        if not isinstance(other, Temperature):
+            return NotImplemented
+        return (self.__kelvin or self.kelvin) == (other.__kelvin or other.kelvin)
+
+    def __hash__(self):
+        """
+        hashes the Kelvin value, like __eq__ compares, so equal Temperatures of any scales hash alike.
+        Don't set value or scale while a Temperature is in a set or a dict key
+        """
+        return hash(self.__kelvin or self.kelvin)
 
     def __ne__(self, other):
-        return not self == other
+        if not isinstance(other, Temperature):
+            return NotImplemented
+        return (self.__kelvin or self.kelvin) != (other.__kelvin or other.kelvin)
 
     def __lt__(self, other):
-        left = "Temperature." + self.__scale.lower() + "2k"
-        right = "Temperature." + other.__scale.lower() + "2k"
-        return eval(left)(self.__value) < eval(right)(other.__value)
+        if not isinstance(other, Temperature):
+            raise TypeError("Temperature object expected.")
+        return (self.__kelvin or self.kelvin) < (other.__kelvin or other.kelvin)
 
     def __le__(self, other):
-        return self < other or self == other
+        if not isinstance(other, Temperature):
+            raise TypeError("Temperature object expected.")
+        return (self.__kelvin or self.kelvin) <= (other.__kelvin or other.kelvin)
 
     def __gt__(self, other):
-        left = "Temperature." + self.__scale.lower() + "2k"
-        right = "Temperature." + other.__scale.lower() + "2k"
-        return eval(left)(self.__value) > eval(right)(other.__value)
+        if not isinstance(other, Temperature):
+            raise TypeError("Temperature object expected.")
+        return (self.__kelvin or self.kelvin) > (other.__kelvin or other.kelvin)
 
     def __ge__(self, other):
-        return self > other or self == other
+        if not isinstance(other, Temperature):
+            raise TypeError("Temperature object expected.")
+        return (self.__kelvin or self.kelvin) >= (other.__kelvin or other.kelvin)
 
     @property
     def dscale(self):
@@ -178,20 +354,23 @@ class Temperature(object):
         sets the display scale
         """
         if not isinstance(scale, str):
-            raise TypeError('Display scale muse be one of ["c", "C", "f", "F", "k", "K"]')
+            raise TypeError('Display scale muse be one of [' + _scale_letters('"{0}"') + ']')
         scale = scale.strip()
-        if len(scale) != 1:
-            raise ValueError('Display scale muse be one of ["c", "C", "f", "F", "k", "K"]')
-        if scale not in ["c", "C", "f", "F", "k", "K"]:
-            raise ValueError('Display scale muse be one of ["c", "C", "f", "F", "k", "K"]')
+        if len(scale) != 1 or scale.upper() not in Temperature.SCALES:
+            raise ValueError('Display scale muse be one of [' + _scale_letters('"{0}"') + ']')
         self.__dscale = scale.upper()
+        self.__dvalue = None
 
     @property
     def dvalue(self):
-        from_ = self.__scale.lower()
-        to = self.__dscale.lower()
-        func = "Temperature." + from_ + "2" + to
-        return eval(func)(self.__value)
+        """
+        returns the value in the display scale.
+        Computed once, then cached until value, scale or dscale is set
+        """
+        dvalue = self.__dvalue
+        if dvalue is None:
+            dvalue = self.__dvalue = _CONVERSIONS[(self.__scale, self.__dscale)](self.__value)
+        return dvalue
 
     @property
     def scale(self):
@@ -206,13 +385,24 @@ class Temperature(object):
         sets the scale
         """
         if not isinstance(scale, str):
-            raise TypeError('Temperature scale muse be one of ["c", "C", "f", "F", "k", "K"]')
+            raise TypeError('Temperature scale muse be one of [' + _scale_letters('"{0}"') + ']')
         scale = scale.strip()
-        if len(scale) != 1:
-            raise ValueError('Temperature scale muse be one of ["c", "C", "f", "F", "k", "K"]')
-        if scale not in ["c", "C", "f", "F", "k", "K"]:
-            raise ValueError('Temperature scale muse be one of ["c", "C", "f", "F", "k", "K"]')
+        if len(scale) != 1 or scale.upper() not in Temperature.SCALES:
+            raise ValueError('Temperature scale muse be one of [' + _scale_letters('"{0}"') + ']')
         self.__scale = scale.upper()
+        self.__kelvin = None
+        self.__dvalue = None
+
+    @property
+    def kelvin(self):
+        """
+        returns the value in Kelvin, the canonical key for equality and ordering.
+        Computed once, then cached until value or scale is set
+        """
+        kelvin = self.__kelvin
+        if kelvin is None:
+            kelvin = self.__kelvin = _TO_KELVIN[self.__scale](self.__value)
+        return kelvin
 
     @property
     def value(self):
@@ -225,6 +415,128 @@ class Temperature(object):
         """
         self.__init__(value)
 
+    @classmethod
+    def sum(cls, temps):
+        """
+        Sums temps, Temperatures or ints and floats, with the same result as reduce(operator.add, temps)
+        up to rounding, but without building a Temperature per step:
+        while every Temperature has the first one's scale, the values are added in that scale
+        (numbers are added as is), from the first one with another scale on, everything is added
+        in Kelvin and the result is in "K". Values are summed per scale with math.fsum.
+
+        Temperature.sum([Temperature("10C"), Temperature("20C")]) -> 30C
+        Temperature.sum([Temperature("0C"), Temperature("32F")]) -> 546.3K
+        """
+        iterator = iter(temps)
+        first = next(iterator, None)
+        if first is None:
+            return cls()
+        if isinstance(first, int) or isinstance(first, float):
+            first = cls(first)
+        elif not isinstance(first, Temperature):
+            raise TypeError("int, float or Temperature object expected.")
+
+        scale = first.__scale
+        run = [first.__value]  # leading values in the first scale
+        rest = {}  # scale -> values after the first scale change, each converted to Kelvin
+        for t in iterator:
+            if isinstance(t, Temperature):
+                if not rest and t.__scale == scale:
+                    run.append(t.__value)
+                else:
+                    rest.setdefault(t.__scale, []).append(t.__value)
+            elif isinstance(t, int) or isinstance(t, float):
+                if not rest:
+                    run.append(t)
+                else:
+                    rest.setdefault("K", []).append(t)
+            else:
+                raise TypeError("int, float or Temperature object expected.")
+
+        total = _exact_sum(run)
+        if not rest:
+            return cls._from_fields(total, scale, first.__dscale)
+        parts = [_TO_KELVIN[scale](total)]
+        for from_, values in rest.items():
+            parts.extend(_kelvin_sum(from_, values))
+        return cls._from_fields(math.fsum(parts), "K", "K")
+
+    @classmethod
+    def mean(cls, temps):
+        """
+        Returns the mean of the Temperatures in temps as a float Temperature.
+        When they all share a scale the mean is in that scale, displayed in the first one's display scale;
+        otherwise it's the mean of their Kelvin values, in "K".
+
+        Temperature.mean([Temperature("10C"), Temperature("15C")]) -> 12.5C
+        """
+        by_scale = {}
+        dscale = None
+        for t in temps:
+            if not isinstance(t, Temperature):
+                raise TypeError("Temperature object expected.")
+            if dscale is None:
+                dscale = t.__dscale
+            by_scale.setdefault(t.__scale, []).append(t.__value)
+        if not by_scale:
+            raise ValueError("mean() of an empty sequence")
+        count = sum(len(values) for values in by_scale.values())
+        if len(by_scale) == 1:
+            scale, values = by_scale.popitem()
+            return cls._from_fields(math.fsum(values) / count, scale, dscale)
+        parts = []
+        for from_, values in by_scale.items():
+            parts.extend(_kelvin_sum(from_, values))
+        return cls._from_fields(math.fsum(parts) / count, "K", "K")
+
+    @staticmethod
+    def unique(temps, resolution=None):
+        """
+        Returns the first occurrence of each distinct value in temps, in order, in linear time.
+        resolution (Kelvin) quantizes the comparison, so "100C" and "212F" (373.15000000000003K)
+        are duplicates with resolution=1e-9; None compares Kelvin values exactly, like ==.
+
+        Temperature.unique([Temperature("0C"), Temperature("32F"), Temperature("1C")]) -> [0C, 1C]
+        """
+        if resolution is not None and not resolution > 0:
+            raise ValueError("resolution must be positive")
+        seen = set()
+        result = []
+        for t in temps:
+            key = _group_key(t, resolution)
+            if key not in seen:
+                seen.add(key)
+                result.append(t)
+        return result
+
+    @staticmethod
+    def group_by(temps, resolution=None):
+        """
+        Groups temps by Kelvin value in linear time. Returns an OrderedDict, in order of first occurrence,
+        from the Kelvin value, or with resolution its multiple of resolution, to the list of Temperatures.
+
+        Temperature.group_by([Temperature("0C"), Temperature("1C"), Temperature("32F")]) -> {273.15: [0C, 32F], 274.15: [1C]}
+        """
+        if resolution is not None and not resolution > 0:
+            raise ValueError("resolution must be positive")
+        groups = OrderedDict()
+        for t in temps:
+            key = _group_key(t, resolution)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(t)
+        if resolution is None:
+            return groups
+        return OrderedDict((key * resolution, group) for key, group in groups.iteritems())
+
+    @staticmethod
+    def sort_key(t):
+        """
+        key function ordering Temperatures of any scale, sorted(temps, key=Temperature.sort_key)
+        """
+        return t.kelvin
+
     @staticmethod
     def c2c(c): return c
 
@@ -235,7 +547,7 @@ class Temperature(object):
     def c2k(c): return c + 273.15
 
     @staticmethod
-    def f2c(f): return (f - 32) * 5/9
+    def f2c(f): return (f - 32) * 5 / 9.0 if (f - 32) % 9 else (f - 32) * 5/9  # whole results of ints stay ints
 
     @staticmethod
     def f2f(f): return f
@@ -255,68 +567,210 @@ class Temperature(object):
     @staticmethod
     def set_default_scale(scale):
         if not isinstance(scale, str):
-            raise TypeError("Invalid scale. Valid scales are : 'c', 'C', 'f', 'F', 'k', 'K'")
-        if len(scale) != 1:
-            raise ValueError("Invalid temperature scale. Valid scales are : 'c', 'C', 'f', 'F', 'k', 'K'")
-        if scale not in ["c", "C", "f", "F", "k", "K"]:
-            raise ValueError("Invalid temperature scale. Valid scales are : 'c', 'C', 'f', 'F', 'k', 'K'")
+            raise TypeError("Invalid scale. Valid scales are : " + _scale_letters("'{0}'"))
+        if len(scale) != 1 or scale.upper() not in Temperature.SCALES:
+            raise ValueError("Invalid temperature scale. Valid scales are : " + _scale_letters("'{0}'"))
         Temperature.DEFAULT_SCALE = scale.upper()
 
-import random
+    @staticmethod
+    def register_scale(name, factor, offset):
+        """
+        Adds the scale name, a letter, defined by its affine map to Kelvin: kelvin = value * factor + offset.
+        Its conversions from and to every other scale are precomposed into one multiply-add, so each
+        conversion costs the same however many scales there are. Pass Fractions for exact coefficients.
+        Register scales at import time: worker processes already started don't see them.
+
+        Temperature.register_scale("O", Fraction(40, 21), Fraction("273.15") - Fraction(15, 2) * Fraction(40, 21))  # Romer
+        t = Temperature("0C"); t.dscale = "o"; str(t) -> "7.5O"
+        """
+        global _TEMPERATURE_RE
+        if not isinstance(name, str) or len(name) != 1 or not name.isalpha():
+            raise ValueError("A scale name must be a single letter")
+        name = name.upper()
+        if name in Temperature.SCALES:
+            raise ValueError("Temperature scale '{0}' is already registered".format(name))
+        for coefficient in (factor, offset):
+            if not isinstance(coefficient, numbers.Real):
+                raise TypeError("int, float or Fraction coefficients expected.")
+            if math.isinf(coefficient) or math.isnan(coefficient):
+                raise ValueError("A scale's coefficients must be finite")
+        if not factor:
+            raise ValueError("A scale's factor can't be 0")
+        _AFFINE[name] = (factor, offset)
+        for other in Temperature.SCALES + (name,):  # converters first, so a listed scale always has them
+            _CONVERSIONS[(name, other)] = _affine_converter(name, other)
+            _CONVERSIONS[(other, name)] = _affine_converter(other, name)
+        _TO_KELVIN[name] = _CONVERSIONS[(name, "K")]
+        Temperature.SCALES += (name,)
+        _TEMPERATURE_RE = _temperature_re(Temperature.SCALES)
+
+    @staticmethod
+    def get_default_scale():
+        """
+        returns the scale of bare numbers in this thread: the innermost scoped_default_scale, else DEFAULT_SCALE
+        """
+        return _scoped_default.scale or Temperature.DEFAULT_SCALE
+
+    @staticmethod
+    @contextmanager
+    def scoped_default_scale(scale):
+        """
+        Sets the default scale for the current thread only, for the duration of a with block.
+        Other threads keep seeing their own scoped scale or the global DEFAULT_SCALE.
+
+        with Temperature.scoped_default_scale("f"):
+            Temperature(72) -> "72F"
+        """
+        scale = _check_scale(scale)
+        previous = _scoped_default.scale
+        _scoped_default.scale = scale
+        try:
+            yield scale
+        finally:
+            _scoped_default.scale = previous
+
+    @staticmethod
+    def enable_parse_cache(maxsize=1024):
+        """
+        Caches the parsing of up to maxsize distinct strings, evicting the least recently used.
+        Worth it when readings repeat a small set of strings. Replaces any enabled cache.
+        """
+        global _parse_cache
+        _parse_cache = ParseCache(maxsize)
+
+    @staticmethod
+    def disable_parse_cache():
+        global _parse_cache
+        _parse_cache = None
+
+    @staticmethod
+    def parse_cache_info():
+        """
+        returns the enabled cache's CacheInfo(hits, misses, evictions, maxsize, currsize), None when disabled
+        """
+        cache = _parse_cache
+        return cache.info() if cache is not None else None
+
+    @staticmethod
+    def parse_many(lines):
+        """
+        Parses many temperature strings in the constructor's grammar without raising per item.
+        lines is an iterable of strings, or a single newline separated string buffer.
+
+        Returns (values, codes, bad): the parsed values, their scale codes (indexes into SCALES)
+        and the indexes of the lines that failed to parse, which get no entry in values or codes.
+
+        Temperature.parse_many(["10.5f", "3", "x"]) -> ([10.5, 3], [1, 0], [2])
+        """
+        if isinstance(lines, str):
+            lines = lines.splitlines()
+        codes_by_scale = dict((scale, code) for code, scale in enumerate(Temperature.SCALES))
+        default_code = codes_by_scale[Temperature.get_default_scale()]
+        values = []
+        codes = []
+        bad = []
+        parse = _parse_cache.parse if _parse_cache is not None else lambda line: _parse(line.strip())
+        for index, line in enumerate(lines):
+            parsed = parse(line) if isinstance(line, str) else None
+            if parsed is None:
+                bad.append(index)
+                continue
+            value, scale = parsed
+            values.append(value)
+            codes.append(default_code if scale is None else codes_by_scale[scale])
+        return values, codes, bad
+
+
+_TEMPERATURE_RE = _temperature_re(Temperature.SCALES)
+
+# scale -> (factor, offset) of its affine map to Kelvin, kelvin = value * factor + offset, exactly
+_AFFINE = {
+    "C": (Fraction(1), Fraction("273.15")),
+    "F": (Fraction(5, 9), Fraction("459.67") * 5 / 9),
+    "K": (Fraction(1), Fraction(0)),
+}
+
+
+def _fraction(number):
+    """
+    returns an int, float or Fraction as the Fraction it reads as, e.g. 0.1 -> 1/10
+    """
+    if isinstance(number, float):
+        return Fraction(repr(number))
+    return Fraction(number)
+
+
+def _affine_converter(from_, to):
+    """
+    returns the converter from_ -> to as a single multiply-add, composed exactly from the scales' maps
+    """
+    from_factor, from_offset = _AFFINE[from_]
+    to_factor, to_offset = _AFFINE[to]
+    factor = float(_fraction(from_factor) / _fraction(to_factor))
+    offset = float((_fraction(from_offset) - _fraction(to_offset)) / _fraction(to_factor))
+    if factor == 1 and offset == 0:
+        return lambda value: value
+    return lambda value: value * factor + offset
+
+
+# (from_scale, to_scale) -> converter, resolved once at import time so the
+# arithmetic, comparison and display paths only do a dict lookup.
+# C, F and K keep their x2y functions, so existing results don't change; register_scale adds
+# composed ones for other scales. The two agree up to float rounding
+_CONVERSIONS = dict(((from_, to), getattr(Temperature, from_.lower() + "2" + to.lower()))
+                    for from_ in "CFK" for to in "CFK")
+
+# scale -> Kelvin converter, the canonical scale for mixed-scale arithmetic and ordering
+_TO_KELVIN = dict((from_, _CONVERSIONS[(from_, "K")]) for from_ in "CFK")
 
-def main():
-    l = []
-    Temperature.set_default_scale("K")
-    for i in range(9, -1, -1):
-        l.append(Temperature(i))
+Temperature.register_scale("R", Fraction(5, 9), 0)  # Rankine, absolute with Fahrenheit sized degrees
+Temperature.register_scale("D", Fraction(-2, 3), Fraction("373.15"))  # Delisle, counting down from boiling water
+Temperature.register_scale("N", Fraction(100, 33), Fraction("273.15"))  # Newton
 
-    for i in l:
-        i.dscale = "F"
 
-    l[5].dscale = "k"
-    for i in l:
-        print i
+def _unpickle(cls, value, scale, dscale=None):
+    return cls._from_fields(value, scale, dscale or scale)
 
-    print l
-    print sorted(l)
-    for i in sorted(l):
-        print i,
-    print
 
-    print "----------------------------"
-    temp_list = []
-    for i in range(20):
-        value = random.randint(-200, 300)
-        scale = random.choice(["C", "F", "K"])
-        t = Temperature(str(value)+scale)
-        t.dscale = "c"
-        temp_list.append(t)
+def _group_key(t, resolution):
+    """
+    the key of Temperature t in unique and group_by: its Kelvin value, or with resolution its nearest multiple index
+    """
+    if not isinstance(t, Temperature):
+        raise TypeError("Temperature object expected.")
+    if resolution is None:
+        return t.kelvin
+    return int(round(t.kelvin / resolution))
 
-    print temp_list
-    print sorted(temp_list)
-    temp_dvale_list = []
-    for t in sorted(temp_list):
-        temp_dvale_list.append(t.dvalue)
-        print t,
-    print
-    print temp_dvale_list
 
-    for t in sorted(temp_list):
-        print t.value,t.scale, "        ", t.dvalue, "      ", Temperature.f2c(t.value)
+def _exact_sum(values):
+    """
+    sums ints exactly as ints, anything else with math.fsum
+    """
+    for value in values:
+        if not isinstance(value, int):
+            return math.fsum(values)
+    return sum(values)
 
-    temp_list[2].haha = "haha"
-    print temp_list[2].__dict__
 
-    t10 = Temperature("37c")
-    t10.dscale="F"
-    print t10
-    print 1.8*37+32
+def _kelvin_sum(scale, values):
+    """
+    Returns addends whose sum is the sum of values each converted from scale to Kelvin.
+    Conversions are affine, to_k(a) + to_k(b) == to_k(a + b) + to_k(0), so the values
+    are summed first and converted once.
+    """
+    to_k = _TO_KELVIN[scale]
+    return [to_k(_exact_sum(values)), (len(values) - 1) * to_k(0)]
 
-    print Temperature.c2f(Temperature.f2c(99.9999))
 
-    print Temperature()
-    print Temperature("0c") + Temperature("32f")
+def main(argv=None):
+    """
+    the streaming converter command line, see temperature_cli
+    """
+    import temperature_cli  # imports this module by name, so run as __main__ it gets the one other modules use
+    return temperature_cli.main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import numpy as np
+
+from temperature import Temperature, _CONVERSIONS, _check_scale
+
+
+def _scale_code(scale):
+    """
+    returns the code of a scale given as a scale string or a scale code
+    """
+    if isinstance(scale, (int, np.integer)) and 0 <= scale < len(Temperature.SCALES):
+        return int(scale)
+    return Temperature.SCALES.index(_check_scale(scale))
+
+
+def _scale_codes(scales, n):
+    """
+    returns a uint8 code column of length n from a single scale or a sequence of scales
+    """
+    if scales is None:
+        scales = Temperature.get_default_scale()
+    if isinstance(scales, (str, int, np.integer)):
+        return np.full(n, _scale_code(scales), dtype=np.uint8)
+    if isinstance(scales, np.ndarray) and scales.dtype.kind in "iu":
+        codes = scales.astype(np.uint8)
+        if codes.shape != (n,) or (codes >= len(Temperature.SCALES)).any():
+            raise ValueError("Invalid scale code column")
+        return codes
+    codes = np.array([_scale_code(scale) for scale in scales], dtype=np.uint8)
+    if codes.shape != (n,):
+        raise ValueError("Expected {0} scales, got {1}".format(n, len(codes)))
+    return codes
+
+
+def convert(values, codes, to):
+    """
+    returns values (with per-element scale codes) converted to the scale with code to,
+    using the same converters as the scalar Temperature
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    to_scale = Temperature.SCALES[to]
+    for code, from_ in enumerate(Temperature.SCALES):
+        mask = codes == code
+        if mask.any():
+            out[mask] = _CONVERSIONS[(from_, to_scale)](values[mask])
+    return out
+
+
+def convert_pairs(values, codes, to_codes):
+    """
+    returns values converted element by element from codes to to_codes
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    for to, to_scale in enumerate(Temperature.SCALES):
+        to_mask = to_codes == to
+        if not to_mask.any():
+            continue
+        for code, from_ in enumerate(Temperature.SCALES):
+            mask = to_mask & (codes == code)
+            if mask.any():
+                out[mask] = _CONVERSIONS[(from_, to_scale)](values[mask])
+    return out
+
+
+class TemperatureArray(object):
+    """
+    A column of temperatures: float64 values plus uint8 scale and display scale codes
+    (indexes into Temperature.SCALES).
+
+    Arithmetic and comparisons follow the scalar Temperature rules element by element.
+    Values are always stored as float64, so integral values come back as floats.
+
+    TemperatureArray([1, 2.5], "F") -> [1.0F, 2.5F]
+    TemperatureArray([0, 32], ["C", "F"]) == Temperature("273.15K") -> [True, True]
+    """
+
+    def __init__(self, values=(), scales=None, dscales=None):
+        self.__values = np.array(values, dtype=np.float64).reshape(-1)
+        self.__codes = _scale_codes(scales, len(self.__values))
+        if dscales is None:
+            self.__dcodes = self.__codes.copy()
+        else:
+            self.__dcodes = _scale_codes(dscales, len(self.__values))
+
+    @classmethod
+    def from_temperatures(cls, temps):
+        """
+        builds an array from an iterable of Temperature objects
+        """
+        temps = list(temps)
+        index = Temperature.SCALES.index
+        return cls([t.value for t in temps],
+                   np.array([index(t.scale) for t in temps], dtype=np.uint8),
+                   np.array([index(t.dscale) for t in temps], dtype=np.uint8))
+
+    @classmethod
+    def parse(cls, lines):
+        """
+        Parses temperature strings (see Temperature.parse_many) into an array.
+        Returns (array, bad) where bad holds the indexes of the lines that failed to parse
+        """
+        values, codes, bad = Temperature.parse_many(lines)
+        return cls(values, np.array(codes, dtype=np.uint8)), bad
+
+    def to_temperatures(self):
+        """
+        returns the array as a list of Temperature objects
+        """
+        return [self[i] for i in xrange(len(self))]
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __iter__(self):
+        return iter(self.to_temperatures())
+
+    def __getitem__(self, index):
+        """
+        an integer index returns a Temperature, a slice, mask or index array returns a TemperatureArray
+        """
+        if isinstance(index, (int, long, np.integer)):
+            return Temperature._from_fields(float(self.__values[index]),
+                                            Temperature.SCALES[self.__codes[index]],
+                                            Temperature.SCALES[self.__dcodes[index]])
+        return TemperatureArray(self.__values[index], self.__codes[index], self.__dcodes[index])
+
+    def __str__(self):
+        return "[{0}]".format(", ".join(str(t) for t in self))
+
+    def __repr__(self):
+        return "TemperatureArray([{0}])".format(", ".join(repr(t) for t in self))
+
+    @property
+    def values(self):
+        """
+        returns the value column
+        """
+        return self.__values
+
+    @property
+    def codes(self):
+        """
+        returns the scale code column
+        """
+        return self.__codes
+
+    @property
+    def dcodes(self):
+        """
+        returns the display scale code column
+        """
+        return self.__dcodes
+
+    @property
+    def dscale(self):
+        """
+        returns the display scales
+        """
+        return [Temperature.SCALES[code] for code in self.__dcodes]
+
+    @dscale.setter
+    def dscale(self, scales):
+        """
+        sets the display scale of every element, or element by element from a sequence
+        """
+        self.__dcodes = _scale_codes(scales, len(self))
+
+    @property
+    def dvalues(self):
+        """
+        returns the values converted to their display scales
+        """
+        return convert_pairs(self.__values, self.__codes, self.__dcodes)
+
+    def kelvin(self):
+        """
+        returns the values converted to Kelvin
+        """
+        return convert(self.__values, self.__codes, Temperature.SCALES.index("K"))
+
+    def to_scale(self, scale):
+        """
+        returns a new array with every value converted to scale, display scale set to scale
+        """
+        code = _scale_code(scale)
+        codes = np.full(len(self), code, dtype=np.uint8)
+        return TemperatureArray(convert(self.__values, self.__codes, code), codes, codes)
+
+    def __coerce(self, other):
+        """
+        returns other as (values, codes) columns that broadcast against self
+        """
+        if isinstance(other, TemperatureArray):
+            if len(other) != len(self):
+                raise ValueError("TemperatureArray lengths differ: {0} and {1}".format(len(self), len(other)))
+            return other.__values, other.__codes
+        if isinstance(other, Temperature):
+            return (np.full(len(self), other.value, dtype=np.float64),
+                    np.full(len(self), Temperature.SCALES.index(other.scale), dtype=np.uint8))
+        raise TypeError("int, float, Temperature or TemperatureArray expected.")
+
+    def __arithmetic(self, other, op):
+        """
+        same scale: op on the raw values, scale & dscale kept
+        mixed scale: op on Kelvin values, scale & dscale set to "K"
+        """
+        if isinstance(other, (int, long, float)):
+            return TemperatureArray(op(self.__values, other), self.__codes, self.__dcodes)
+
+        values, codes = self.__coerce(other)
+        k = Temperature.SCALES.index("K")
+        same = self.__codes == codes
+        result = np.where(same, op(self.__values, values),
+                          op(convert(self.__values, self.__codes, k), convert(values, codes, k)))
+        return TemperatureArray(result,
+                                np.where(same, self.__codes, k).astype(np.uint8),
+                                np.where(same, self.__dcodes, k).astype(np.uint8))
+
+    def __add__(self, other):
+        return self.__arithmetic(other, np.add)
+
+    def __sub__(self, other):
+        return self.__arithmetic(other, np.subtract)
+
+    def __compare(self, other, op):
+        values, codes = self.__coerce(other)
+        k = Temperature.SCALES.index("K")
+        return op(self.kelvin(), convert(values, codes, k))
+
+    def __eq__(self, other):
+        return self.__compare(other, np.equal)
+
+    def __ne__(self, other):
+        return self.__compare(other, np.not_equal)
+
+    def __lt__(self, other):
+        return self.__compare(other, np.less)
+
+    def __le__(self, other):
+        return self.__compare(other, np.less_equal)
+
+    def __gt__(self, other):
+        return self.__compare(other, np.greater)
+
+    def __ge__(self, other):
+        return self.__compare(other, np.greater_equal)
@@ -0,0 +1,194 @@
+"""
+Streaming command line converter, run as python -m temperature
+
+python -m temperature -t F readings.txt              convert every reading to Fahrenheit
+python -m temperature -t K --sort --unique < in.txt  sorted distinct Kelvin values
+python -m temperature -t C --aggregate -w 4 big.txt  count, min, max, mean, stddev and percentiles
+python -m temperature -t C --stats in.txt > out.txt  throughput on stderr
+
+Input lines are in the constructor's grammar; lines that fail to parse are counted and skipped.
+Input is processed chunk by chunk, so it can be larger than memory: sorting spills sorted runs
+to temporary files and merges them, and --unique with --sort only compares neighbours.
+"""
+import argparse
+import heapq
+import itertools
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from temperature import Temperature, _check_scale
+from temperature_io import TemperatureFormatter, iter_chunks
+from temperature_parallel import ParallelConverter
+from temperature_stats import QuantileSketch, RunningStats
+
+_RUN_BLOCK = 4096  # values per marshal record in a spilled sorted run
+_MERGE_WIDTH = 64  # most runs merged, and so open, at once
+
+
+def _spill(values, directory):
+    """
+    writes the sorted values, any iterable, to a new file in directory, returns its path
+    """
+    fd, path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "wb") as run:
+        for block in iter_chunks(values, _RUN_BLOCK):
+            marshal.dump(block, run)
+    return path
+
+
+def _read_run(path):
+    """
+    yields the values of a spilled run, then deletes it
+    """
+    with open(path, "rb") as run:
+        while True:
+            try:
+                block = marshal.load(run)
+            except EOFError:
+                break
+            for value in block:
+                yield value
+    os.remove(path)
+
+
+def _merge_runs(paths):
+    return heapq.merge(*[_read_run(path) for path in paths])
+
+
+def _sorted_values(chunks):
+    """
+    Merges the sorted value chunks into one ascending stream, holding at most two chunks in memory.
+    Runs are spilled to closed files and merged _MERGE_WIDTH at a time, in as many passes as it takes,
+    so the open files stay bounded however large the input.
+    """
+    directory = None
+    runs = []
+    first = None
+    try:
+        for values in chunks:
+            if first is None:
+                first = values
+                continue
+            if directory is None:
+                directory = tempfile.mkdtemp(prefix="temperature-sort-")
+                runs.append(_spill(first, directory))
+            runs.append(_spill(values, directory))
+        if not runs:
+            for value in first or []:
+                yield value
+            return
+        while len(runs) > _MERGE_WIDTH:
+            runs = [_spill(_merge_runs(runs[i:i + _MERGE_WIDTH]), directory)
+                    for i in xrange(0, len(runs), _MERGE_WIDTH)]
+        for value in _merge_runs(runs):
+            yield value
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _unique_sorted(values):
+    return (value for value, _ in itertools.groupby(values))
+
+
+def _unique(values):
+    seen = set()
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            yield value
+
+
+def _aggregate(values, scale, out):
+    stats = RunningStats()
+    sketch = QuantileSketch()
+    for chunk in values:
+        stats.add_many(chunk, scale)
+        sketch.add_many(chunk, scale)
+    out.write("count\t{0}\n".format(stats.count))
+    if not stats.count:
+        return
+    for name, value in [("min", stats.min(scale)), ("max", stats.max(scale)), ("mean", stats.mean(scale)),
+                        ("stddev", stats.stddev(scale))]:
+        out.write("{0}\t{1}{2}\n".format(name, value, scale))
+    for q, value in zip([50, 95, 99], sketch.quantiles([0.5, 0.95, 0.99], scale)):
+        out.write("p{0}\t{1}{2}\n".format(q, value, scale))
+
+
+def _lines(paths, stdin):
+    """
+    chains the lines of the files at paths, "-" being stdin
+    """
+    for path in paths or ["-"]:
+        if path == "-":
+            for line in stdin:
+                yield line
+        else:
+            with open(path, "rb") as f:
+                for line in f:
+                    yield line
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    parser = argparse.ArgumentParser(prog="python -m temperature",
+                                     description="Convert streams of temperature readings to one scale")
+    parser.add_argument("files", nargs="*", help="files of readings, one per line; stdin if none or -")
+    parser.add_argument("-t", "--to", default="C", help="target scale (default C)")
+    parser.add_argument("-d", "--default-scale", help="scale of bare numbers (default C)")
+    parser.add_argument("-p", "--precision", type=int, help="decimals of the output values")
+    parser.add_argument("-s", "--sort", action="store_true", help="output in ascending order")
+    parser.add_argument("-u", "--unique", action="store_true", help="drop repeated values")
+    parser.add_argument("-a", "--aggregate", action="store_true",
+                        help="print count, min, max, mean, stddev and p50/p95/p99 instead of the values")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes, 0 for one per CPU (default 1, in process)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=100000, help="readings per chunk (default 100000)")
+    parser.add_argument("--stats", action="store_true", help="print throughput statistics on stderr")
+    args = parser.parse_args(argv)
+
+    try:
+        scale = _check_scale(args.to)
+        default_scale = _check_scale(args.default_scale or Temperature.get_default_scale())
+        formatter = TemperatureFormatter(precision=args.precision, chunk_size=args.chunk_size)
+        converter = ParallelConverter(scale, args.chunk_size, args.workers)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+
+    start = time.time()
+    counts = {"values": 0, "bad": 0}
+
+    def chunks():
+        for values, bad in converter.iter_chunks(_lines(args.files, stdin), sort=args.sort):
+            counts["values"] += len(values)
+            counts["bad"] += len(bad)
+            yield values
+
+    with converter, Temperature.scoped_default_scale(default_scale):
+        if args.aggregate:
+            _aggregate(chunks(), scale, stdout)
+        else:
+            if args.sort:
+                values = _sorted_values(chunks())
+                values = _unique_sorted(values) if args.unique else values
+            else:
+                values = itertools.chain.from_iterable(chunks())
+                values = _unique(values) if args.unique else values
+            code = Temperature.SCALES.index(scale)
+            for chunk in iter_chunks(values, args.chunk_size):
+                formatter.write_columns(chunk, [code] * len(chunk), stdout)
+    stdout.flush()
+
+    seconds = time.time() - start
+    if counts["bad"]:
+        stderr.write("{0} lines failed to parse\n".format(counts["bad"]))
+    if args.stats:
+        lines = counts["values"] + counts["bad"]
+        stderr.write("{0} lines, {1} converted, {2} bad in {3:.3f}s: {4:.0f} lines/s\n".format(
+            lines, counts["values"], counts["bad"], seconds, lines / seconds if seconds else 0.0))
+    return 0
@@ -0,0 +1,289 @@
+"""
+Fixed-point temperatures: an integer count of ticks, 1/resolution Kelvin each (millikelvin by default)
+
+Comparisons and equality are exact integer operations, and so are additions except the same-scale
+ones of scales whose zero isn't a whole number of ticks (0F is 255372.2 mK), which round to the tick.
+Numbers are converted to ticks exactly, through fractions, and back only for display, to the shortest
+decimal within half a tick:
+
+FixedTemperature("0.1C") + FixedTemperature("0.2C") == FixedTemperature("0.3C") -> True
+t = FixedTemperature("98.6F"); t.dscale = "c"; t.dscale = "f"; str(t) -> "98.6F"
+"""
+from fractions import Fraction
+
+from temperature import Temperature, _AFFINE, _check_scale, _fraction, _parse, _parse_error
+
+RESOLUTION = 1000  # ticks per Kelvin
+
+_tick_affine = {}  # (scale, resolution) -> (ticks per degree, ticks at 0 degrees), as Fractions
+_float_tick_affine = {}  # the same as floats
+_zero_tick = {}  # (scale, resolution) -> ticks at 0 degrees, rounded
+
+
+def _ticks_affine(scale, resolution):
+    affine = _tick_affine.get((scale, resolution))
+    if affine is None:
+        size, zero = _AFFINE[scale]  # Kelvin per degree and at 0 degrees, from the scale registry
+        affine = _tick_affine[(scale, resolution)] = (_fraction(size) * resolution, _fraction(zero) * resolution)
+    return affine
+
+
+def _float_ticks_affine(scale, resolution):
+    """
+    _ticks_affine() as floats, for display
+    """
+    affine = _float_tick_affine.get((scale, resolution))
+    if affine is None:
+        affine = _float_tick_affine[(scale, resolution)] = tuple(float(f) for f in _ticks_affine(scale, resolution))
+    return affine
+
+
+def _zero_ticks(scale, resolution):
+    """
+    0 degrees of scale in whole ticks
+    """
+    zero = _zero_tick.get((scale, resolution))
+    if zero is None:
+        zero = _zero_tick[(scale, resolution)] = _round(_ticks_affine(scale, resolution)[1])
+    return zero
+
+
+def _round(fraction):
+    """
+    rounds a Fraction to the nearest int, halves up
+    """
+    return (2 * fraction.numerator + fraction.denominator) // (2 * fraction.denominator)
+
+
+def _exact(number):
+    """
+    returns an int or float as the Fraction it reads as, e.g. 0.1 -> 1/10
+    """
+    numerator, denominator = _ratio(number)
+    return Fraction(numerator, denominator)
+
+
+def _ratio(number):
+    """
+    returns an int or float as the (numerator, denominator) it reads as, e.g. 0.25 -> (25, 100)
+    """
+    if isinstance(number, (int, long)):
+        return number, 1
+    if not isinstance(number, float):
+        raise TypeError("int, float or Temperature object expected.")
+    text = repr(number)  # the shortest string that reads back as number
+    if "e" in text or "n" in text:  # exponent, inf or nan
+        try:
+            fraction = Fraction(text)
+        except ValueError:
+            raise ValueError("FixedTemperature values must be finite")
+        return fraction.numerator, fraction.denominator
+    whole, _, decimals = text.partition(".")
+    return int(whole + decimals), 10 ** len(decimals)
+
+
+def _to_ticks(number, scale, resolution):
+    """
+    the ticks of number degrees of scale, rounded; integer arithmetic only
+    """
+    numerator, denominator = _ratio(number)
+    per_degree, zero = _ticks_affine(scale, resolution)
+    # number * per_degree + zero over a common denominator
+    num = (numerator * per_degree.numerator * zero.denominator
+           + zero.numerator * per_degree.denominator * denominator)
+    den = denominator * per_degree.denominator * zero.denominator
+    return (2 * num + den) // (2 * den)
+
+
+class FixedTemperature(object):
+    """
+    A temperature held as an integer number of 1/resolution Kelvin ticks, with the scale it was given in
+    (used for display and same-scale arithmetic, like Temperature's scale) and a display scale.
+
+    FixedTemperature() -> "0.0C"
+    FixedTemperature("10.5f") -> "10.5F"
+    FixedTemperature(300, "k") -> "300.0K"
+    FixedTemperature(Temperature("20C"), resolution=100) -> "20.0C"
+    """
+
+    __slots__ = ("__ticks", "__resolution", "__scale", "__dscale")
+
+    def __init__(self, value=None, scale=None, resolution=RESOLUTION):
+        """
+        value: None (0 degrees), int, float, a temperature string or a Temperature object
+        scale: the scale of a number, the default scale if None
+        resolution: ticks per Kelvin
+        """
+        if not isinstance(resolution, (int, long)) or resolution < 1:
+            raise ValueError("resolution must be a positive int")
+        if value is None:
+            value = 0
+        if isinstance(value, Temperature):
+            value, scale = value.value, value.scale
+        elif isinstance(value, str):
+            if scale is not None:
+                raise ValueError("scale is only for numbers, a string carries its own")
+            parsed = _parse(value.strip())
+            if parsed is None:
+                raise _parse_error(value.strip())
+            value, scale = parsed
+        if scale is None:
+            scale = Temperature.get_default_scale()
+        self.__scale = self.__dscale = _check_scale(scale)
+        self.__resolution = resolution
+        self.__ticks = _to_ticks(value, self.__scale, resolution)
+
+    @classmethod
+    def from_ticks(cls, ticks, resolution=RESOLUTION, scale="K"):
+        """
+        builds a FixedTemperature of ticks 1/resolution Kelvin, displayed in scale
+        """
+        if not isinstance(ticks, (int, long)):
+            raise TypeError("int ticks expected")
+        if not isinstance(resolution, (int, long)) or resolution < 1:
+            raise ValueError("resolution must be a positive int")
+        scale = _check_scale(scale)
+        return cls._from_fields(ticks, resolution, scale, scale)
+
+    @classmethod
+    def _from_fields(cls, ticks, resolution, scale, dscale):
+        """
+        builds a FixedTemperature straight from already validated fields, skipping __init__
+        """
+        t = object.__new__(cls)
+        t.__ticks = ticks
+        t.__resolution = resolution
+        t.__scale = scale
+        t.__dscale = dscale
+        return t
+
+    @property
+    def ticks(self):
+        return self.__ticks
+
+    @property
+    def resolution(self):
+        return self.__resolution
+
+    @property
+    def scale(self):
+        return self.__scale
+
+    @property
+    def dscale(self):
+        return self.__dscale
+
+    @dscale.setter
+    def dscale(self, scale):
+        self.__dscale = _check_scale(scale)
+
+    def __display(self, scale):
+        """
+        the value in scale as a float with the fewest decimals within half a tick, e.g. 10.5F, not 10.5008F
+        """
+        per_degree, zero = _float_ticks_affine(scale, self.__resolution)
+        value = (self.__ticks - zero) / per_degree
+        half_tick = 0.5 / abs(per_degree)  # degrees may run backwards, as in Delisle
+        for digits in xrange(17):
+            rounded = round(value, digits)
+            if abs(rounded - value) <= half_tick:
+                return rounded + 0.0  # -0.0 -> 0.0, e.g. 0F is a fraction of a tick below zero
+        return value
+
+    @property
+    def value(self):
+        return self.__display(self.__scale)
+
+    @property
+    def dvalue(self):
+        return self.__display(self.__dscale)
+
+    @property
+    def kelvin(self):
+        return float(Fraction(self.__ticks, self.__resolution))
+
+    def to_temperature(self):
+        """
+        returns the Temperature of value in scale, displayed in dscale
+        """
+        return Temperature._from_fields(self.value, self.__scale, self.__dscale)
+
+    def __str__(self):
+        return "{0}{1}".format(self.dvalue, self.__dscale)
+
+    def __repr__(self):
+        return "{0}{1}".format(self.value, self.__scale)
+
+    def __check(self, other):
+        if not isinstance(other, FixedTemperature):
+            raise TypeError("int, float or FixedTemperature object expected.")
+        if other.__resolution != self.__resolution:
+            raise ValueError("FixedTemperature resolutions differ: {0} and {1}".format(
+                self.__resolution, other.__resolution))
+
+    def __degrees(self, number):
+        """
+        the ticks of number degrees of scale, a temperature difference
+        """
+        return _round(_exact(number) * _ticks_affine(self.__scale, self.__resolution)[0])
+
+    def __add__(self, other):
+        """
+        Like Temperature: numbers are degrees of scale, same-scale temperatures add their values,
+        mixed-scale ones their Kelvin values, giving a Kelvin temperature
+        """
+        if isinstance(other, (int, long, float)):
+            ticks = self.__ticks + self.__degrees(other)
+            return FixedTemperature._from_fields(ticks, self.__resolution, self.__scale, self.__dscale)
+        self.__check(other)
+        if self.__scale == other.__scale:
+            ticks = self.__ticks + other.__ticks - _zero_ticks(self.__scale, self.__resolution)
+            return FixedTemperature._from_fields(ticks, self.__resolution, self.__scale, self.__dscale)
+        return FixedTemperature._from_fields(self.__ticks + other.__ticks, self.__resolution, "K", "K")
+
+    def __sub__(self, other):
+        if isinstance(other, (int, long, float)):
+            ticks = self.__ticks - self.__degrees(other)
+            return FixedTemperature._from_fields(ticks, self.__resolution, self.__scale, self.__dscale)
+        self.__check(other)
+        if self.__scale == other.__scale:
+            ticks = self.__ticks - other.__ticks + _zero_ticks(self.__scale, self.__resolution)
+            return FixedTemperature._from_fields(ticks, self.__resolution, self.__scale, self.__dscale)
+        return FixedTemperature._from_fields(self.__ticks - other.__ticks, self.__resolution, "K", "K")
+
+    # the comparisons compare ticks, cross-multiplied by the resolutions when they differ
+    def __eq__(self, other):
+        if not isinstance(other, FixedTemperature):
+            return NotImplemented
+        if self.__resolution == other.__resolution:
+            return self.__ticks == other.__ticks
+        return self.__ticks * other.__resolution == other.__ticks * self.__resolution
+
+    def __ne__(self, other):
+        if not isinstance(other, FixedTemperature):
+            return NotImplemented
+        return not self == other
+
+    def __cmp(self, other):
+        if not isinstance(other, FixedTemperature):
+            raise TypeError("FixedTemperature object expected.")
+        if self.__resolution == other.__resolution:
+            return cmp(self.__ticks, other.__ticks)
+        return cmp(self.__ticks * other.__resolution, other.__ticks * self.__resolution)
+
+    def __lt__(self, other):
+        if isinstance(other, FixedTemperature) and self.__resolution == other.__resolution:
+            return self.__ticks < other.__ticks  # the common case, sorting
+        return self.__cmp(other) < 0
+
+    def __le__(self, other):
+        return self.__cmp(other) <= 0
+
+    def __gt__(self, other):
+        return self.__cmp(other) > 0
+
+    def __ge__(self, other):
+        return self.__cmp(other) >= 0
+
+    def __hash__(self):
+        return hash(Fraction(self.__ticks, self.__resolution))
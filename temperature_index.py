@@ -0,0 +1,125 @@
+from bisect import bisect_left, bisect_right
+
+from temperature import Temperature
+
+
+def _kelvin(bound):
+    """
+    returns the Kelvin key of a Temperature, or of anything the Temperature constructor accepts
+    """
+    if isinstance(bound, Temperature):
+        return bound.kelvin
+    return Temperature(bound).kelvin
+
+
+class TemperatureIndex(object):
+    """
+    Temperatures kept sorted on their canonical Kelvin key, for range and nearest-neighbour queries.
+    Lookups bisect the sorted keys, O(log n) plus the size of the result.
+
+    Bounds and targets may be Temperatures or anything the constructor accepts, in any scale:
+    index.range("30C", "95F"), index.nearest("300K", 3)
+
+    Indexed Temperatures must not have their value or scale changed while in the index.
+    """
+
+    def __init__(self, temps=()):
+        items = sorted(temps, key=Temperature.sort_key)
+        self.__keys = [t.kelvin for t in items]
+        self.__items = items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __contains__(self, t):
+        return self.__find(t) is not None
+
+    def __find(self, t):
+        """
+        returns the position of the Temperature t (the same object) in the index, None if absent
+        """
+        key = t.kelvin
+        for i in xrange(bisect_left(self.__keys, key), bisect_right(self.__keys, key)):
+            if self.__items[i] is t:
+                return i
+        return None
+
+    def add(self, t):
+        """
+        adds the Temperature t, after any indexed Temperatures equal to it
+        """
+        if not isinstance(t, Temperature):
+            raise TypeError("Temperature object expected.")
+        key = t.kelvin
+        i = bisect_right(self.__keys, key)
+        self.__keys.insert(i, key)
+        self.__items.insert(i, t)
+
+    def remove(self, t):
+        """
+        removes the Temperature t (the same object), raises ValueError if it isn't indexed
+        """
+        i = self.__find(t)
+        if i is None:
+            raise ValueError("Temperature {0!r} is not in the index".format(t))
+        del self.__keys[i]
+        del self.__items[i]
+
+    def __bounds(self, low, high, inclusive):
+        """
+        returns the [start, stop) positions of the Temperatures between low and high
+        """
+        low_inclusive, high_inclusive = inclusive
+        if low is None:
+            start = 0
+        elif low_inclusive:
+            start = bisect_left(self.__keys, _kelvin(low))
+        else:
+            start = bisect_right(self.__keys, _kelvin(low))
+        if high is None:
+            stop = len(self.__keys)
+        elif high_inclusive:
+            stop = bisect_right(self.__keys, _kelvin(high))
+        else:
+            stop = bisect_left(self.__keys, _kelvin(high))
+        return start, max(start, stop)
+
+    def range(self, low=None, high=None, inclusive=(True, True)):
+        """
+        Returns the Temperatures between low and high, in ascending order.
+        A bound of None is unbounded, inclusive is a (low, high) pair of flags.
+
+        index.range("30C", "95F") -> readings from 30C to 95F, both included
+        index.range("0C", inclusive=(False, True)) -> readings above freezing
+        """
+        start, stop = self.__bounds(low, high, inclusive)
+        return self.__items[start:stop]
+
+    def count(self, low=None, high=None, inclusive=(True, True)):
+        """
+        returns the number of Temperatures between low and high, see range
+        """
+        start, stop = self.__bounds(low, high, inclusive)
+        return stop - start
+
+    def nearest(self, target, k=1):
+        """
+        Returns the k Temperatures closest to target, closest first.
+        Ties are broken towards the lower temperature.
+        """
+        key = _kelvin(target)
+        keys = self.__keys
+        right = bisect_left(keys, key)
+        left = right - 1
+        result = []
+        while len(result) < k and (left >= 0 or right < len(keys)):
+            if right >= len(keys) or (left >= 0 and key - keys[left] <= keys[right] - key):
+                result.append(self.__items[left])
+                left -= 1
+            else:
+                result.append(self.__items[right])
+                right += 1
+        return result
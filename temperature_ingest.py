@@ -0,0 +1,249 @@
+"""
+Ingestion front-end for sensor readings
+
+Sensors send newline separated temperature strings in the constructor's grammar. An IngestServer
+(or IngestChannel per connection) runs on an asyncore event loop and feeds the lines into an
+Ingestor, a bounded queue that consumers drain in parsed batches:
+
+ingestor = Ingestor(maxsize=100000, batch_size=1000)
+server = IngestServer(("0.0.0.0", 9999), ingestor)
+thread = threading.Thread(target=asyncore.loop, kwargs={"timeout": 0.05})
+thread.start()
+for temps, bad_lines in ingestor.batches():
+    ...
+"""
+import asyncore
+import socket
+import threading
+import time
+from collections import deque
+
+from temperature import Temperature
+
+BLOCK = "block"  # producers wait for room: the event loop stops reading, so TCP pushes back on senders
+DROP_NEWEST = "drop_newest"  # incoming readings are discarded while the queue is full
+DROP_OLDEST = "drop_oldest"  # the oldest queued readings are discarded to make room
+POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+
+class Ingestor(object):
+    """
+    Bounded queue of raw temperature strings, consumed as parsed batches.
+    Thread safe: any number of producers and consumers.
+    """
+
+    def __init__(self, maxsize=10000, batch_size=1000, max_wait=0.01, policy=BLOCK):
+        """
+        maxsize: queued readings before the policy applies
+        batch_size: most readings per batch
+        max_wait: seconds a consumer waits for a batch to fill once it holds a reading, bounding latency
+        policy: what put() does when the queue is full, one of POLICIES
+        """
+        if policy not in POLICIES:
+            raise ValueError("policy must be one of {0}".format(list(POLICIES)))
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError("maxsize and batch_size must be positive")
+        self.policy = policy
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.received = 0
+        self.dropped = 0
+        self.parsed = 0
+        self.bad = 0
+        self.__lines = deque()
+        self.__closed = False
+        # one lock for the queue, the flag and the counters; closing is signalled through the
+        # conditions, not queued, so it never waits for room
+        self.__lock = threading.Lock()
+        self.__not_empty = threading.Condition(self.__lock)
+        self.__not_full = threading.Condition(self.__lock)
+
+    def full(self):
+        return len(self.__lines) >= self.maxsize
+
+    def qsize(self):
+        return len(self.__lines)
+
+    @property
+    def closed(self):
+        return self.__closed
+
+    def put(self, line, block=None, timeout=None):
+        """
+        Queues the raw reading line. Returns True if it was queued, False if the policy dropped it
+        or, when not blocking, there was no room (or the Ingestor was closed while waiting for it).
+        block defaults to True for the BLOCK policy; pass False from an event loop, which must not wait.
+        """
+        with self.__lock:
+            if self.__closed:
+                raise ValueError("put() on a closed Ingestor")
+            lines = self.__lines
+            self.received += 1
+            if len(lines) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == DROP_OLDEST:
+                    lines.popleft()
+                    self.dropped += 1
+                elif not self.__wait(self.__not_full, lambda: len(lines) < self.maxsize,
+                                     timeout if block is not False else 0):
+                    self.received -= 1  # not taken, the caller still holds it
+                    return False
+            lines.append(line)
+            self.__not_empty.notify()
+            return True
+
+    def __wait(self, condition, ready, timeout):
+        """
+        With the lock held, waits on condition up to timeout (None: forever) until ready() or closed.
+        Returns ready().
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not ready() and not self.__closed:
+            if deadline is None:
+                condition.wait()
+            else:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+        return ready()
+
+    def close(self):
+        """
+        stops accepting readings, without waiting; consumers finish once the queue is drained
+        """
+        with self.__lock:
+            self.__closed = True
+            self.__not_empty.notify_all()
+            self.__not_full.notify_all()
+
+    def get_batch(self, timeout=None):
+        """
+        Waits up to timeout (None: forever) for readings, then returns (temps, bad_lines) for up to
+        batch_size of them; ([], []) on timeout. Returns None once closed and drained.
+        """
+        queued = self.__lines
+        with self.__lock:
+            if not self.__wait(self.__not_empty, lambda: bool(queued), timeout):
+                return None if self.__closed else ([], [])
+            lines = []
+            deadline = time.time() + self.max_wait
+            while True:
+                while queued and len(lines) < self.batch_size:
+                    lines.append(queued.popleft())
+                self.__not_full.notify_all()
+                if len(lines) >= self.batch_size or self.__closed:
+                    break
+                if not self.__wait(self.__not_empty, lambda: bool(queued), deadline - time.time()):
+                    break
+
+        values, codes, bad = Temperature.parse_many(lines)
+        scales = Temperature.SCALES
+        temps = [Temperature._from_fields(value, scales[code], scales[code]) for value, code in zip(values, codes)]
+        with self.__lock:
+            self.parsed += len(temps)
+            self.bad += len(bad)
+        return temps, [lines[i] for i in bad]
+
+    def batches(self):
+        """
+        generator of (temps, bad_lines) batches until the Ingestor is closed and drained
+        """
+        while True:
+            batch = self.get_batch()
+            if batch is None:
+                return
+            yield batch
+
+    def readings(self):
+        """
+        generator of parsed Temperatures until the Ingestor is closed and drained; bad lines are skipped
+        """
+        for temps, bad_lines in self.batches():
+            for t in temps:
+                yield t
+
+
+class IngestChannel(asyncore.dispatcher):
+    """
+    Reads newline separated readings from one connected socket into an Ingestor.
+    While the Ingestor is full under the BLOCK policy the channel stops reading, leaving the data
+    in the socket buffers so the sender is slowed down instead of the event loop being blocked.
+    """
+
+    def __init__(self, sock, ingestor, map=None, read_size=65536):
+        asyncore.dispatcher.__init__(self, sock, map)
+        self.ingestor = ingestor
+        self.read_size = read_size
+        self.__partial = ""  # an incomplete trailing line
+        self.__pending = []  # complete lines waiting for room in the ingestor
+        self.__closing = False  # the peer is gone, close once pending lines are handed over
+
+    def __flush(self):
+        """
+        hands pending lines to the ingestor without blocking, returns True once they're all taken
+        """
+        pending = self.__pending
+        taken = 0
+        for line in pending:
+            if not self.ingestor.put(line, block=False) and self.ingestor.policy == BLOCK:
+                break
+            taken += 1
+        del pending[:taken]
+        return not pending
+
+    def readable(self):
+        # called on every event loop iteration, which retries handing over pending lines
+        flushed = self.__flush()
+        if self.__closing:
+            if flushed:
+                self.close()
+            return False
+        return flushed
+
+    def writable(self):
+        return False
+
+    def handle_read(self):
+        data = self.recv(self.read_size)
+        if not data:
+            return
+        lines = (self.__partial + data).split("\n")
+        self.__partial = lines.pop()
+        self.__pending.extend(line for line in lines if line.strip())
+        self.__flush()
+
+    def handle_close(self):
+        if self.__partial.strip():
+            self.__pending.append(self.__partial)
+            self.__partial = ""
+        self.__closing = True
+        if self.__flush():
+            self.close()
+
+
+class IngestServer(asyncore.dispatcher):
+    """
+    Listens on address and reads every accepted connection into the Ingestor with an IngestChannel
+    """
+
+    def __init__(self, address, ingestor, map=None, backlog=128):
+        asyncore.dispatcher.__init__(self, map=map)
+        self.ingestor = ingestor
+        self.__map = map
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind(address)
+        self.listen(backlog)
+
+    @property
+    def address(self):
+        return self.socket.getsockname()
+
+    def handle_accept(self):
+        accepted = self.accept()
+        if accepted is not None:
+            IngestChannel(accepted[0], self.ingestor, self.__map)
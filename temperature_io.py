@@ -0,0 +1,212 @@
+import cStringIO
+import csv
+import itertools
+import time
+
+from temperature import Temperature, _CONVERSIONS, _check_scale
+
+
+def iter_chunks(iterable, chunk_size):
+    """
+    yields lists of at most chunk_size items from iterable
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_column(rows, column, scale):
+    """
+    Re-expresses the temperature strings in rows[i][column] in scale, in place, formatted like str(Temperature).
+    Returns the indexes (into rows) of the rows whose temperature failed to parse; they are left untouched.
+    """
+    scale = scale.upper()
+    values, codes, bad = Temperature.parse_many([row[column] if len(row) > column else None for row in rows])
+    converters = [_CONVERSIONS[(from_, scale)] for from_ in Temperature.SCALES]
+    skip = set(bad)
+    parsed = 0
+    for index, row in enumerate(rows):
+        if index in skip:
+            continue
+        row[column] = "{0}{1}".format(converters[codes[parsed]](values[parsed]), scale)
+        parsed += 1
+    return bad
+
+
+class CsvConverter(object):
+    """
+    Streams a CSV file, re-expressing one column of temperature strings in a target scale.
+    Rows are processed chunk_size at a time, so memory use doesn't depend on the size of the file.
+
+    converter = CsvConverter("temp", "F")
+    with open("in.csv", "rb") as src, open("out.csv", "wb") as dst:
+        converter.convert(src, dst)
+    """
+
+    def __init__(self, column, scale, chunk_size=10000, header=True, progress=None, dialect="excel", bad_row=None):
+        """
+        column: the column name (requires a header) or its index
+        scale: the target scale, one of Temperature.SCALES
+        progress: called after every chunk with (rows, bad_rows, seconds) so far
+        bad_row: called with (row number, row) for every data row, 0 based, whose temperature failed to parse;
+        only the count is kept, so memory use stays constant however many there are
+        """
+        if not isinstance(column, int) and not header:
+            raise ValueError("A column name requires a header row")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.column = column
+        self.scale = _check_scale(scale)
+        self.chunk_size = chunk_size
+        self.header = header
+        self.progress = progress
+        self.bad_row = bad_row
+        self.dialect = dialect
+        self.rows = 0
+        self.bad_rows = 0  # count of the rows whose temperature failed to parse
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def iter_chunks(self, infile):
+        """
+        Generator of converted row chunks read from infile, a CSV file object.
+        The header row, when there is one, is yielded unchanged as the first chunk.
+        """
+        reader = csv.reader(infile, self.dialect)
+        column = self.column
+        self.rows = 0
+        self.bad_rows = 0
+        start = time.time()
+        if self.header:
+            names = next(reader, None)
+            if names is None:
+                return
+            if not isinstance(column, int):
+                if column not in names:
+                    raise ValueError("No column named '{0}'".format(column))
+                column = names.index(column)
+            yield [names]
+
+        for chunk in iter_chunks(reader, self.chunk_size):
+            bad = convert_column(chunk, column, self.scale)
+            self.bad_rows += len(bad)
+            if self.bad_row is not None:
+                for index in bad:
+                    self.bad_row(self.rows + index, chunk[index])
+            self.rows += len(chunk)
+            self.seconds = time.time() - start
+            if self.progress is not None:
+                self.progress(self.rows, self.bad_rows, self.seconds)
+            yield chunk
+
+    def convert(self, infile, outfile):
+        """
+        converts the CSV file object infile into outfile, returns the number of data rows written
+        """
+        writer = csv.writer(outfile, self.dialect)
+        for chunk in self.iter_chunks(infile):
+            writer.writerows(chunk)
+        return self.rows
+
+
+class TemperatureFormatter(object):
+    """
+    Writes many temperatures as text, chunk_size at a time, one "<value><scale>" per item followed by sep.
+    By default items look like str(t): the display value and scale with the float's usual repr.
+    scale re-expresses everything in that scale; precision fixes the number of decimals.
+
+    formatter = TemperatureFormatter("F", precision=2)
+    formatter.write(temps, outfile)
+    formatter.format([Temperature("100C")]) -> "212.00F\n"
+    """
+
+    def __init__(self, scale=None, precision=None, sep="\n", chunk_size=10000):
+        """
+        scale: the output scale, one of Temperature.SCALES; None keeps each Temperature's display scale
+        precision: decimals after the point, None for str()'s formatting
+        """
+        if precision is not None and (not isinstance(precision, int) or precision < 0):
+            raise ValueError("precision must be a non-negative int")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.scale = None if scale is None else _check_scale(scale)
+        self.precision = precision
+        self.sep = sep
+        self.chunk_size = chunk_size
+        self.__template = ("%s" if precision is None else "%.{0}f".format(precision)) + "%s" + sep.replace("%", "%%")
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __write_pairs(self, chunks, outfile):
+        """
+        writes chunks of (values, scale letters) lists, returns the number of items written
+        """
+        template = self.__template
+        self.rows = 0
+        start = time.time()
+        for values, scales in chunks:
+            outfile.write("".join([template % pair for pair in itertools.izip(values, scales)]))
+            self.rows += len(values)
+            self.seconds = time.time() - start
+        return self.rows
+
+    def write(self, temps, outfile):
+        """
+        writes every Temperature in temps to the file object outfile, returns the number written
+        """
+        scale = self.scale
+
+        def chunks():
+            for chunk in iter_chunks(temps, self.chunk_size):
+                if scale is None:
+                    yield [t.dvalue for t in chunk], [t.dscale for t in chunk]
+                else:
+                    yield [_CONVERSIONS[(t.scale, scale)](t.value) for t in chunk], [scale] * len(chunk)
+        return self.__write_pairs(chunks(), outfile)
+
+    def write_columns(self, values, codes, outfile, dcodes=None):
+        """
+        Writes a columnar batch, e.g. from Temperature.parse_many or a TemperatureArray: values, their scale
+        codes (indexes into Temperature.SCALES) and optionally display scale codes, used when scale is None.
+        Returns the number written.
+        """
+        scales = Temperature.SCALES
+        # numpy and array.array columns become lists of plain numbers, which format like Temperature values
+        values, codes = [column.tolist() if hasattr(column, "tolist") else column for column in (values, codes)]
+        if dcodes is not None and hasattr(dcodes, "tolist"):
+            dcodes = dcodes.tolist()
+        if len(values) != len(codes) or (dcodes is not None and len(dcodes) != len(values)):
+            raise ValueError("values, codes and dcodes must have the same length")
+
+        def chunks():
+            for begin in xrange(0, len(values), self.chunk_size):
+                end = begin + self.chunk_size
+                chunk_values = values[begin:end]
+                from_codes = codes[begin:end]
+                to_codes = from_codes if dcodes is None else dcodes[begin:end]
+                if self.scale is None:
+                    to_scales = [scales[code] for code in to_codes]
+                else:
+                    to_scales = [self.scale] * len(chunk_values)
+                converted = [_CONVERSIONS[(scales[code], to)](value)
+                             for value, code, to in itertools.izip(chunk_values, from_codes, to_scales)]
+                yield converted, to_scales
+        return self.__write_pairs(chunks(), outfile)
+
+    def format(self, temps):
+        """
+        returns what write() would write for temps, as a string
+        """
+        buf = cStringIO.StringIO()
+        self.write(temps, buf)
+        return buf.getvalue()
@@ -0,0 +1,177 @@
+"""
+Opt-in instrumentation of the Temperature hot paths
+
+temperature_metrics.enable(sample_every=100, callback=exporter)
+...
+temperature_metrics.snapshot() -> {"conversions": {"c2f": 12, ...}, "parse": {"int": 3, ...}, ...}
+
+enable() swaps counting wrappers into the conversion tables, the string parser and the arithmetic
+operators; disable() puts the originals back, so nothing is paid while it's off.
+Counted:
+    conversions: every converter the Temperature machinery dispatches to (dvalue, kelvin, the
+        array, io and stats modules), by pair, e.g. "c2f". Direct calls of Temperature.c2f aren't counted
+    parse: parser outcomes, "int", "float", "suffixed" or "error". With the parse cache enabled
+        only cache misses reach the parser, see Temperature.parse_cache_info() for the hits
+    arithmetic: "add", "sub", and "add.mixed", "sub.mixed" for those falling back to Kelvin
+Every sample_every-th call of each conversion pair, of the parser and of each operator is timed.
+Worker processes started by ParallelConverter keep their own counters.
+"""
+import threading
+import timeit
+
+import temperature
+from temperature import Temperature
+
+_lock = threading.Lock()
+_counts = {}  # (group, name) -> calls
+_latency = {}  # name -> [samples, total seconds]
+_sample_every = 100
+_callback = None
+_originals = None  # what enable() replaced, None while disabled
+
+
+def _record(name, seconds):
+    with _lock:
+        sampled = _latency.get(name)
+        if sampled is None:
+            sampled = _latency[name] = [0, 0.0]
+        sampled[0] += 1
+        sampled[1] += seconds
+    callback = _callback
+    if callback is not None:
+        callback(name, seconds)
+
+
+def _count(key):
+    """
+    counts a call of key, returns True when it is to be timed
+    """
+    with _lock:
+        calls = _counts[key] = _counts.get(key, 0) + 1
+    return calls % _sample_every == 0
+
+
+def _counted_conversion(name, convert):
+    key = ("conversions", name)
+
+    def wrapper(value):
+        if not _count(key):
+            return convert(value)
+        start = timeit.default_timer()
+        result = convert(value)
+        _record(name, timeit.default_timer() - start)
+        return result
+    return wrapper
+
+
+def _counted_parse(parse):
+    key = ("parse", None)  # all outcomes, decides the sampling
+
+    def wrapper(value):
+        timed = _count(key)
+        start = timeit.default_timer()
+        parsed = parse(value)
+        if timed:
+            _record("parse", timeit.default_timer() - start)
+        if parsed is None:
+            outcome = "error"
+        elif parsed[1] is not None:
+            outcome = "suffixed"
+        else:
+            outcome = "int" if isinstance(parsed[0], (int, long)) else "float"
+        _count(("parse", outcome))
+        return parsed
+    return wrapper
+
+
+def _counted_operator(name, operator):
+    key = ("arithmetic", name)
+    mixed = ("arithmetic", name + ".mixed")
+
+    def wrapper(self, other):
+        timed = _count(key)
+        if isinstance(other, Temperature) and self.scale != other.scale:
+            _count(mixed)
+        if not timed:
+            return operator(self, other)
+        start = timeit.default_timer()
+        result = operator(self, other)
+        _record(name, timeit.default_timer() - start)
+        return result
+    return wrapper
+
+
+def enabled():
+    return _originals is not None
+
+
+def enable(sample_every=100, callback=None):
+    """
+    Starts counting. sample_every: time one call in this many, per counter.
+    callback: called with (name, seconds) for every timed call, e.g. to feed a metrics exporter.
+    Enabling again only changes sample_every and callback.
+    """
+    global _originals, _sample_every, _callback
+    if sample_every < 1:
+        raise ValueError("sample_every must be positive")
+    _sample_every = sample_every
+    _callback = callback
+    if _originals is not None:
+        return
+
+    conversions = dict(temperature._CONVERSIONS)
+    to_kelvin = dict(temperature._TO_KELVIN)
+    operators = dict((name, Temperature.__dict__["__{0}__".format(name)]) for name in ("add", "sub"))
+    wrappers = {}
+    for (from_, to), convert in conversions.items():
+        wrappers[(from_, to)] = _counted_conversion("{0}2{1}".format(from_, to).lower(), convert)
+    for pair, wrapper in wrappers.items():  # updated in place, the other modules hold the same dicts
+        temperature._CONVERSIONS[pair] = wrapper
+    for from_ in to_kelvin:
+        temperature._TO_KELVIN[from_] = wrappers[(from_, "K")]
+    parse = temperature._parse
+    temperature._parse = _counted_parse(parse)
+    for name, operator in operators.items():
+        setattr(Temperature, "__{0}__".format(name), _counted_operator(name, operator))
+    _originals = (conversions, to_kelvin, operators, parse)
+
+
+def disable():
+    """
+    stops counting and restores the uninstrumented code; the counters are kept until reset()
+    """
+    global _originals, _callback
+    if _originals is None:
+        return
+    conversions, to_kelvin, operators, parse = _originals
+    temperature._CONVERSIONS.update(conversions)
+    temperature._TO_KELVIN.update(to_kelvin)
+    temperature._parse = parse
+    for name, operator in operators.items():
+        setattr(Temperature, "__{0}__".format(name), operator)
+    _originals = None
+    _callback = None
+
+
+def reset():
+    """
+    zeroes every counter and latency sample
+    """
+    with _lock:
+        _counts.clear()
+        _latency.clear()
+
+
+def snapshot():
+    """
+    Returns the counters so far as a dict of plain dicts:
+    {"conversions": {pair: calls}, "parse": {outcome: calls}, "arithmetic": {name: calls},
+     "latency": {name: (samples, mean seconds)}}
+    """
+    result = {"conversions": {}, "parse": {}, "arithmetic": {}}
+    with _lock:
+        for (group, name), calls in _counts.items():
+            if name is not None:
+                result[group][name] = calls
+        result["latency"] = dict((name, (samples, total / samples)) for name, (samples, total) in _latency.items())
+    return result
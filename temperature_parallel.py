@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import multiprocessing
+from collections import deque
+
+from temperature import Temperature, _CONVERSIONS, _check_scale
+from temperature_io import iter_chunks
+
+
+def convert_chunk(lines, scale, default_scale, sort=False):
+    """
+    Parses lines of temperature strings and converts them to scale.
+    default_scale is the scale of bare numbers, passed along since worker processes don't see
+    set_default_scale calls made after they started.
+    Returns (values, bad): the converted values, in input order or sorted, and the indexes of bad lines.
+    """
+    scale = scale.upper()
+    with Temperature.scoped_default_scale(default_scale):  # in-process too, without touching DEFAULT_SCALE
+        values, codes, bad = Temperature.parse_many(lines)
+    converters = [_CONVERSIONS[(from_, scale)] for from_ in Temperature.SCALES]
+    values = [converters[code](value) for value, code in itertools.izip(values, codes)]
+    if sort:
+        values.sort()
+    return values, bad
+
+
+def _convert_chunk(args):
+    return convert_chunk(*args)
+
+
+class ParallelConverter(object):
+    """
+    Parses and converts large batches of temperature strings across a process pool.
+    The input is split into chunk_size chunks; at most 2 chunks per worker are in flight,
+    so an input iterator (e.g. a file) is never read far ahead of the results.
+
+    with ParallelConverter("K", workers=4) as converter:
+        values, bad = converter.convert(open("readings.txt"), sort=True)
+    """
+
+    def __init__(self, scale, chunk_size=100000, workers=None):
+        """
+        scale: the target scale, one of Temperature.SCALES
+        workers: number of processes, the number of CPUs if None or 0; 1 converts in this process
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if workers is not None and workers < 0:
+            raise ValueError("workers must not be negative")
+        self.scale = _check_scale(scale)
+        self.chunk_size = chunk_size
+        self.workers = workers or multiprocessing.cpu_count()
+        self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        shuts down the worker processes
+        """
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    def iter_chunks(self, lines, sort=False):
+        """
+        Generator of (values, bad) per chunk of lines, in input order.
+        bad holds indexes into the whole input; values are sorted within each chunk if sort is set.
+        """
+        lines = lines.splitlines() if isinstance(lines, str) else lines
+        chunks = iter_chunks(lines, self.chunk_size)
+        tasks = ((chunk, self.scale, Temperature.get_default_scale(), sort) for chunk in chunks)
+        offset = 0
+        if self.workers == 1:
+            results = itertools.imap(_convert_chunk, tasks)
+        else:
+            results = self.__imap_bounded(tasks)
+        for values, bad in results:
+            yield values, [offset + index for index in bad]
+            offset += len(values) + len(bad)
+
+    def __imap_bounded(self, tasks):
+        """
+        like Pool.imap, but only keeps 2 tasks per worker in flight instead of queueing the whole input
+        """
+        if self.__pool is None:
+            self.__pool = multiprocessing.Pool(self.workers)
+        pending = deque()
+        for task in tasks:
+            pending.append(self.__pool.apply_async(convert_chunk, task))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def convert(self, lines, sort=False):
+        """
+        Converts all of lines, an iterable of temperature strings or a newline separated buffer.
+        Returns (values, bad): the converted values in input order (ascending if sort is set)
+        and the indexes of the lines that failed to parse.
+        """
+        chunks = []
+        bad = []
+        for values, chunk_bad in self.iter_chunks(lines, sort):
+            chunks.append(values)
+            bad.extend(chunk_bad)
+        if sort:
+            return list(heapq.merge(*chunks)), bad
+        return list(itertools.chain.from_iterable(chunks)), bad
+
+
+def convert_many(lines, scale, chunk_size=100000, workers=None, sort=False):
+    """
+    Parses and converts lines of temperature strings to scale across a process pool.
+    Returns (values, bad), see ParallelConverter.convert
+    """
+    with ParallelConverter(scale, chunk_size, workers) as converter:
+        return converter.convert(lines, sort)
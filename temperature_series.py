@@ -0,0 +1,182 @@
+"""
+Timestamped temperature series
+
+series = TemperatureSeries(dscale="C")
+series.append(time.time(), Temperature("21.5C"))
+series.append(time.time(), 70.2, "F")
+series.resample(60, "max")  -> a TemperatureSeries of per minute maximums
+series.rolling(300, "mean") -> a TemperatureSeries of trailing 5 minute means
+"""
+import array
+import bisect
+import math
+from collections import deque
+
+from temperature import Temperature, _CONVERSIONS, _check_scale
+from temperature_stats import _to_kelvin
+
+AGGREGATES = ("min", "max", "mean", "last")
+
+
+def _check_how(how):
+    if how not in AGGREGATES:
+        raise ValueError("how must be one of {0}".format(list(AGGREGATES)))
+    return how
+
+
+class TemperatureSeries(object):
+    """
+    Append-only series of (time, temperature) samples in time order, stored as two array columns:
+    the times, as float seconds, and the temperatures normalized to Kelvin.
+    Readings in any scale go in; values come out in the display scale dscale.
+    """
+
+    def __init__(self, samples=(), scale=None, dscale=None):
+        """
+        samples: (time, Temperature or number) pairs, numbers are in scale (the default scale if None)
+        dscale: the display scale, the default scale if None
+        """
+        self.__times = array.array("d")
+        self.__kelvins = array.array("d")
+        self.dscale = dscale or Temperature.get_default_scale()
+        self.extend(samples, scale)
+
+    @classmethod
+    def _from_columns(cls, times, kelvins, dscale):
+        series = cls(dscale=dscale)
+        series.__times = times
+        series.__kelvins = kelvins
+        return series
+
+    @property
+    def dscale(self):
+        return self.__dscale
+
+    @dscale.setter
+    def dscale(self, scale):
+        self.__dscale = _check_scale(scale)
+
+    def append(self, time, t, scale=None):
+        """
+        adds a Temperature, or a number in scale, at time, which must not be before the last sample's
+        """
+        kelvin = _to_kelvin(t, scale)
+        times = self.__times
+        if times and time < times[-1]:
+            raise ValueError("samples must be appended in time order: {0} is before {1}".format(time, times[-1]))
+        times.append(time)
+        self.__kelvins.append(kelvin)
+
+    def extend(self, samples, scale=None):
+        """
+        appends every (time, Temperature or number in scale) pair of samples
+        """
+        for time, t in samples:
+            self.append(time, t, scale)
+
+    def __len__(self):
+        return len(self.__times)
+
+    def __getitem__(self, index):
+        """
+        returns the (time, Temperature displayed in dscale) sample at index
+        """
+        return self.__times[index], Temperature._from_fields(self.__kelvins[index], "K", self.__dscale)
+
+    def __iter__(self):
+        for index in xrange(len(self.__times)):
+            yield self[index]
+
+    @property
+    def times(self):
+        """
+        the time column, an array.array of floats; don't modify it
+        """
+        return self.__times
+
+    def values(self, scale=None):
+        """
+        returns the temperatures in scale, dscale if None, as a list of floats
+        """
+        convert = _CONVERSIONS[("K", _check_scale(scale or self.__dscale))]
+        return [convert(kelvin) for kelvin in self.__kelvins]
+
+    def between(self, start, end):
+        """
+        returns the samples with start <= time < end as a new series
+        """
+        low = bisect.bisect_left(self.__times, start)
+        high = bisect.bisect_left(self.__times, end)
+        return TemperatureSeries._from_columns(self.__times[low:high], self.__kelvins[low:high], self.__dscale)
+
+    def resample(self, interval, how="mean", origin=0.0):
+        """
+        Downsamples to one sample per interval seconds, aggregated with how, one of AGGREGATES.
+        Buckets start at origin + k * interval and are timed by their start; empty buckets are left out.
+        """
+        _check_how(how)
+        if not interval > 0:
+            raise ValueError("interval must be positive")
+        times = array.array("d")
+        kelvins = array.array("d")
+        bucket = None
+        values = []
+
+        def flush():
+            times.append(origin + bucket * interval)
+            if how == "min":
+                kelvins.append(min(values))
+            elif how == "max":
+                kelvins.append(max(values))
+            elif how == "mean":
+                kelvins.append(math.fsum(values) / len(values))
+            else:
+                kelvins.append(values[-1])
+
+        for time, kelvin in zip(self.__times, self.__kelvins):
+            index = math.floor((time - origin) / interval)
+            if index != bucket:
+                if values:
+                    flush()
+                bucket = index
+                values = []
+            values.append(kelvin)
+        if values:
+            flush()
+        return TemperatureSeries._from_columns(times, kelvins, self.__dscale)
+
+    def rolling(self, window, how="mean"):
+        """
+        Returns the series of how, one of AGGREGATES, over the trailing window seconds at every sample:
+        that sample and the ones before it with time - window < their time.
+        Computed incrementally in one pass: a running sum for the mean, monotonic queues for min and max.
+        """
+        _check_how(how)
+        if not window > 0:
+            raise ValueError("window must be positive")
+        source_times = self.__times
+        source_kelvins = self.__kelvins
+        kelvins = array.array("d")
+        start = 0  # index of the oldest sample in the window
+        total = 0.0
+        extremes = deque()  # indexes of the window's candidate minimums or maximums, in time order
+        better = (lambda a, b: a <= b) if how == "min" else (lambda a, b: a >= b)
+
+        for index, time in enumerate(source_times):
+            kelvin = source_kelvins[index]
+            while source_times[start] <= time - window:
+                total -= source_kelvins[start]
+                start += 1
+            if how == "mean":
+                total += kelvin
+                kelvins.append(total / (index - start + 1))
+            elif how == "last":
+                kelvins.append(kelvin)
+            else:
+                while extremes and better(kelvin, source_kelvins[extremes[-1]]):
+                    extremes.pop()
+                extremes.append(index)
+                while extremes[0] < start:
+                    extremes.popleft()
+                kelvins.append(source_kelvins[extremes[0]])
+        return TemperatureSeries._from_columns(array.array("d", source_times), kelvins, self.__dscale)
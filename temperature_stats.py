@@ -0,0 +1,323 @@
+import bisect
+import itertools
+import math
+import random
+
+from temperature import Temperature, _CONVERSIONS, _TO_KELVIN, _check_scale
+
+
+def _to_kelvin(t, scale=None):
+    """
+    returns the Kelvin value of a Temperature, or of a number in scale (default scale if None)
+    """
+    if isinstance(t, Temperature):
+        return t.kelvin
+    if not isinstance(t, (int, long, float)):
+        raise TypeError("int, float or Temperature object expected.")
+    return _TO_KELVIN[_check_scale(scale or Temperature.get_default_scale())](t)
+
+
+def _degree_size(scale):
+    """
+    returns how many degrees of scale one Kelvin is, the factor for converting differences
+    """
+    convert = _CONVERSIONS[("K", scale)]
+    return convert(1.0) - convert(0.0)
+
+
+class RunningStats(object):
+    """
+    O(1) memory min, max, mean and variance over a stream of temperatures in any scales.
+    Everything is accumulated in Kelvin with Welford's update, and reported in the requested scale.
+    Partial results, e.g. from parallel partitions, combine with merge().
+
+    stats = RunningStats()
+    stats.add(Temperature("20C"))
+    stats.add(68, "F")
+    stats.mean("C") -> 20.0
+    """
+
+    def __init__(self, temps=()):
+        self.count = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0  # sum of squared differences from the mean
+        self.__min = None
+        self.__max = None
+        self.add_many(temps)
+
+    def add(self, t, scale=None):
+        """
+        adds a Temperature, or a number in scale (the default scale if None)
+        """
+        kelvin = _to_kelvin(t, scale)
+        self.count += 1
+        delta = kelvin - self.__mean
+        self.__mean += delta / self.count
+        self.__m2 += delta * (kelvin - self.__mean)
+        if self.__min is None or kelvin < self.__min:
+            self.__min = kelvin
+        if self.__max is None or kelvin > self.__max:
+            self.__max = kelvin
+
+    def add_many(self, temps, scale=None):
+        """
+        adds every Temperature, or number in scale, in temps
+        """
+        for t in temps:
+            self.add(t, scale)
+
+    def merge(self, other):
+        """
+        folds the statistics of other into these, as if all its temperatures had been added; returns self
+        """
+        if not isinstance(other, RunningStats):
+            raise TypeError("RunningStats object expected.")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.__mean, self.__m2 = other.count, other.__mean, other.__m2
+            self.__min, self.__max = other.__min, other.__max
+            return self
+        count = self.count + other.count
+        delta = other.__mean - self.__mean
+        self.__mean += delta * other.count / count
+        self.__m2 += other.__m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.__min = min(self.__min, other.__min)
+        self.__max = max(self.__max, other.__max)
+        return self
+
+    def __convert(self, kelvin, scale):
+        if kelvin is None:
+            return None
+        return _CONVERSIONS[("K", _check_scale(scale))](kelvin)
+
+    def min(self, scale="K"):
+        """
+        returns the lowest temperature in scale, None if nothing was added
+        """
+        return self.__convert(self.__min, scale)
+
+    def max(self, scale="K"):
+        """
+        returns the highest temperature in scale, None if nothing was added
+        """
+        return self.__convert(self.__max, scale)
+
+    def mean(self, scale="K"):
+        """
+        returns the mean temperature in scale, None if nothing was added
+        """
+        return self.__convert(self.__mean if self.count else None, scale)
+
+    def variance(self, scale="K", ddof=0):
+        """
+        returns the variance in squared degrees of scale, None with ddof or fewer temperatures.
+        ddof=0 is the population variance, ddof=1 the sample variance
+        """
+        if self.count <= ddof:
+            return None
+        return self.__m2 / (self.count - ddof) * _degree_size(_check_scale(scale)) ** 2
+
+    def stddev(self, scale="K", ddof=0):
+        """
+        returns the standard deviation in degrees of scale, None with ddof or fewer temperatures
+        """
+        variance = self.variance(scale, ddof)
+        return None if variance is None else math.sqrt(variance)
+
+
+class QuantileSketch(object):
+    """
+    Bounded memory, mergeable quantile sketch (KLL) over a stream of temperatures in any scales.
+    Temperatures are kept in Kelvin in a hierarchy of compactors: when one fills up it sorts itself and
+    promotes every other item, picked at random, to the next level, where items weigh twice as much.
+
+    Error: a quantile query returns an item whose true rank is within about 2/k of the requested one
+    with high probability (within 1% at the default k=200); rank() and histogram() err likewise.
+    Memory is O(k) items regardless of the count; min and max are exact.
+
+    sketch = QuantileSketch()
+    sketch.add_many(temps)
+    sketch.quantiles([0.5, 0.95, 0.99], "C")
+    """
+
+    def __init__(self, temps=(), k=200, seed=None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.__random = random.Random(seed)
+        self.__compactors = [[]]  # level h holds items of weight 2 ** h
+        self.__size = 0  # items held
+        self.__capacity = self.__total_capacity()
+        self.__min = None
+        self.__max = None
+        self.__sorted = None  # (kelvins, cumulative weights), cached between additions
+        self.add_many(temps)
+
+    def __level_capacity(self, level):
+        # the top level holds k items, each one below 2/3 as many, but at least 2
+        return int(math.ceil(self.k * (2.0 / 3) ** (len(self.__compactors) - level - 1))) + 1
+
+    def __total_capacity(self):
+        return sum(self.__level_capacity(level) for level in range(len(self.__compactors)))
+
+    def add(self, t, scale=None):
+        """
+        adds a Temperature, or a number in scale (the default scale if None)
+        """
+        kelvin = _to_kelvin(t, scale)
+        self.__compactors[0].append(kelvin)
+        self.count += 1
+        self.__size += 1
+        if self.__min is None or kelvin < self.__min:
+            self.__min = kelvin
+        if self.__max is None or kelvin > self.__max:
+            self.__max = kelvin
+        self.__sorted = None
+        if self.__size >= self.__capacity:
+            self.__compress()
+
+    def add_many(self, temps, scale=None):
+        """
+        adds every Temperature, or number in scale, in temps
+        """
+        iterator = iter(temps)
+        while True:  # fill the lowest level up to the next compaction, a batch at a time
+            kelvins = [_to_kelvin(t, scale) for t in itertools.islice(iterator, self.__capacity - self.__size)]
+            if not kelvins:
+                return
+            self.__compactors[0].extend(kelvins)
+            self.count += len(kelvins)
+            self.__size += len(kelvins)
+            low, high = min(kelvins), max(kelvins)
+            if self.__min is None or low < self.__min:
+                self.__min = low
+            if self.__max is None or high > self.__max:
+                self.__max = high
+            self.__sorted = None
+            if self.__size >= self.__capacity:
+                self.__compress()
+
+    def __compress(self):
+        compactors = self.__compactors
+        for level in range(len(compactors)):
+            items = compactors[level]
+            if len(items) < self.__level_capacity(level):
+                continue
+            if level + 1 == len(compactors):
+                compactors.append([])
+                self.__capacity = self.__total_capacity()
+            items.sort()
+            kept = items[:len(items) % 2]  # an odd item out stays
+            start = len(kept) + self.__random.randint(0, 1)
+            compactors[level + 1].extend(items[start::2])
+            compactors[level] = kept
+            self.__size = sum(len(items) for items in compactors)
+            if self.__size < self.__capacity:
+                break
+
+    def merge(self, other):
+        """
+        folds other into this sketch, as if all its temperatures had been added; returns self
+        """
+        if not isinstance(other, QuantileSketch):
+            raise TypeError("QuantileSketch object expected.")
+        if other.count == 0:
+            return self
+        while len(self.__compactors) < len(other.__compactors):
+            self.__compactors.append([])
+        for level, items in enumerate(other.__compactors):
+            self.__compactors[level].extend(items)
+        self.__capacity = self.__total_capacity()
+        self.count += other.count
+        self.__size = sum(len(items) for items in self.__compactors)
+        self.__min = other.__min if self.__min is None else min(self.__min, other.__min)
+        self.__max = other.__max if self.__max is None else max(self.__max, other.__max)
+        self.__sorted = None
+        while self.__size >= self.__capacity:
+            self.__compress()
+        return self
+
+    def __weighted(self):
+        """
+        returns the held items sorted, and their cumulative weights
+        """
+        if self.__sorted is None:
+            pairs = sorted((kelvin, 1 << level) for level, items in enumerate(self.__compactors) for kelvin in items)
+            kelvins = [kelvin for kelvin, weight in pairs]
+            cumulative = []
+            total = 0
+            for kelvin, weight in pairs:
+                total += weight
+                cumulative.append(total)
+            self.__sorted = kelvins, cumulative
+        return self.__sorted
+
+    def __convert(self, kelvin, scale):
+        return _CONVERSIONS[("K", _check_scale(scale))](kelvin)
+
+    def quantile(self, q, scale="K"):
+        """
+        returns the temperature in scale below which a fraction q of the temperatures lie, None if empty.
+        quantile(0) and quantile(1) are the exact min and max
+        """
+        return self.quantiles([q], scale)[0]
+
+    def quantiles(self, qs, scale="K"):
+        """
+        returns quantile(q, scale) for every q in qs, sorting the sketch only once
+        """
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError("quantiles must be between 0 and 1")
+        if self.count == 0:
+            return [None] * len(qs)
+        kelvins, cumulative = self.__weighted()
+        result = []
+        for q in qs:
+            if q == 0:
+                kelvin = self.__min
+            elif q == 1:
+                kelvin = self.__max
+            else:
+                index = bisect.bisect_left(cumulative, q * cumulative[-1])
+                kelvin = kelvins[min(index, len(kelvins) - 1)]
+            result.append(self.__convert(kelvin, scale))
+        return result
+
+    def rank(self, t, scale=None):
+        """
+        returns the estimated fraction of the temperatures at or below a Temperature, or a number in scale
+        """
+        if self.count == 0:
+            return None
+        kelvins, cumulative = self.__weighted()
+        index = bisect.bisect_right(kelvins, _to_kelvin(t, scale))
+        return cumulative[index - 1] / float(cumulative[-1]) if index else 0.0
+
+    def histogram(self, edges, scale="K"):
+        """
+        Returns the estimated number of temperatures in each bin between the ascending edges, in scale:
+        [below edges[0], edges[0] up to edges[1], ..., edges[-1] and above], len(edges) + 1 counts.
+        """
+        to_kelvin = _TO_KELVIN[_check_scale(scale)]
+        kelvin_edges = [to_kelvin(edge) for edge in edges]
+        if kelvin_edges != sorted(kelvin_edges):
+            raise ValueError("edges must be in ascending temperature order")
+        if self.count == 0:
+            return [0] * (len(edges) + 1)
+        kelvins, cumulative = self.__weighted()
+        below = [0]
+        for edge in kelvin_edges:
+            index = bisect.bisect_left(kelvins, edge)
+            below.append(cumulative[index - 1] if index else 0)
+        below.append(cumulative[-1])
+        return [high - low for low, high in zip(below, below[1:])]  # compaction keeps the total weight, count
+
+    def min(self, scale="K"):
+        return None if self.__min is None else self.__convert(self.__min, scale)
+
+    def max(self, scale="K"):
+        return None if self.__max is None else self.__convert(self.__max, scale)
@@ -0,0 +1,325 @@
+"""
+Fixed-width binary storage for temperature series
+
+File layout, all little-endian:
+  header   32 bytes: magic "TEMPSER1", uint16 version, uint16 flags, uint64 count, 12 reserved bytes
+  values   count float64
+  codes    count uint8, the scale code (index into Temperature.SCALES), bit 7 set for an int value
+  dcodes   count uint8 display scale codes, only when flags has HAS_DSCALE
+
+Int values are stored as float64 too, so ints beyond 2**53 lose precision.
+
+pack_batch and unpack_batch encode readings in memory with the same codes, values stored as
+int64 or float64 according to the int flag, so they round-trip exactly.
+"""
+import array
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for the zero-copy column views
+    np = None
+
+from temperature import Temperature
+
+MAGIC = "TEMPSER1"
+VERSION = 1
+HAS_DSCALE = 1
+INT_FLAG = 0x80
+_HEADER = struct.Struct("<8sHHQ12x")
+
+
+class TemperatureWriter(object):
+    """
+    Writes a temperature series file, streaming values straight to disk.
+
+    with TemperatureWriter("readings.tser", dscale=True) as writer:
+        writer.write_many(temps)
+    """
+
+    def __init__(self, path, dscale=False, buffer_size=65536):
+        """
+        dscale: also store each Temperature's display scale
+        """
+        self.path = path
+        self.dscale = dscale
+        self.count = 0
+        self.__buffer_size = buffer_size
+        self.__file = open(path, "wb")
+        self.__file.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        self.__codes_file = tempfile.TemporaryFile()
+        self.__dcodes_file = tempfile.TemporaryFile() if dscale else None
+        self.__values = array.array("d")
+        self.__codes = bytearray()
+        self.__dcodes = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, t):
+        """
+        appends the Temperature t
+        """
+        code = Temperature.SCALES.index(t.scale)
+        value = t.value
+        if isinstance(value, (int, long)):
+            code |= INT_FLAG
+        self.__values.append(value)
+        self.__codes.append(code)
+        if self.dscale:
+            self.__dcodes.append(Temperature.SCALES.index(t.dscale))
+        self.count += 1
+        if len(self.__codes) >= self.__buffer_size:
+            self.flush()
+
+    def write_many(self, temps):
+        """
+        appends every Temperature in temps
+        """
+        for t in temps:
+            self.write(t)
+
+    def flush(self):
+        """
+        writes the buffered records out
+        """
+        if sys.byteorder != "little":
+            self.__values.byteswap()
+        self.__values.tofile(self.__file)
+        self.__codes_file.write(self.__codes)
+        if self.dscale:
+            self.__dcodes_file.write(self.__dcodes)
+        self.__values = array.array("d")
+        self.__codes = bytearray()
+        self.__dcodes = bytearray()
+
+    def close(self):
+        """
+        appends the code columns and writes the final header
+        """
+        if self.__file is None:
+            return
+        self.flush()
+        for column in (self.__codes_file, self.__dcodes_file):
+            if column is not None:
+                column.seek(0)
+                shutil.copyfileobj(column, self.__file)
+                column.close()
+        self.__file.seek(0)
+        self.__file.write(_HEADER.pack(MAGIC, VERSION, HAS_DSCALE if self.dscale else 0, self.count))
+        self.__file.close()
+        self.__file = None
+
+
+def write(path, temps, dscale=False):
+    """
+    writes the Temperatures in temps to a new series file at path, returns the number written
+    """
+    with TemperatureWriter(path, dscale) as writer:
+        writer.write_many(temps)
+    return writer.count
+
+
+# the batch codec, for shipping readings between processes: the same columns, in a string
+BATCH_MAGIC = "TMPB"
+_BATCH_HEADER = struct.Struct("<4sBBxxI")  # magic, uint8 version, uint8 flags, 2 reserved bytes, uint32 count
+
+
+def pack_batch(temps):
+    """
+    Encodes a sequence of Temperatures as a string: a 12 byte header, a scale code byte per reading
+    (bit 7 set for an int value), display scale codes only if any differ from the scale, and per reading
+    an int64 for an int value or a float64. value, scale and dscale come back exactly from unpack_batch.
+    """
+    index = dict((scale, code) for code, scale in enumerate(Temperature.SCALES)).__getitem__
+    codes = bytearray()
+    dcodes = bytearray()
+    values = []
+    for t in temps:
+        value = t.value
+        code = index(t.scale)
+        codes.append(code | INT_FLAG if isinstance(value, (int, long)) else code)
+        dcodes.append(index(t.dscale))
+        values.append(value)
+    flags = HAS_DSCALE if dcodes != codes.translate(_CLEAR_INT_FLAG) else 0
+    fmt = "<" + str(codes.translate(_VALUE_FORMATS))
+    try:
+        packed = struct.pack(fmt, *values)
+    except struct.error:
+        raise ValueError("int values must fit in 64 bits")
+    header = _BATCH_HEADER.pack(BATCH_MAGIC, VERSION, flags, len(codes))
+    return "".join([header, str(codes), str(dcodes) if flags else "", packed])
+
+
+def unpack_batch(data):
+    """
+    decodes a string made by pack_batch back into a list of Temperatures
+    """
+    if len(data) < _BATCH_HEADER.size:
+        raise ValueError("not a temperature batch")
+    magic, version, flags, count = _BATCH_HEADER.unpack_from(data)
+    if magic != BATCH_MAGIC:
+        raise ValueError("not a temperature batch")
+    if version != VERSION:
+        raise ValueError("Unsupported temperature batch version {0}".format(version))
+    offset = _BATCH_HEADER.size
+    codes = bytearray(data[offset:offset + count])
+    offset += count
+    if flags & HAS_DSCALE:
+        dcodes = bytearray(data[offset:offset + count])
+        offset += count
+    else:
+        dcodes = codes.translate(_CLEAR_INT_FLAG)
+    fmt = "<" + str(codes.translate(_VALUE_FORMATS))
+    if len(codes) != count or len(data) != offset + struct.calcsize(fmt):
+        raise ValueError("truncated temperature batch")
+    values = struct.unpack_from(fmt, data, offset)
+    scales = Temperature.SCALES
+    from_fields = Temperature._from_fields
+    return [from_fields(value, scales[code & ~INT_FLAG], scales[dcode])
+            for value, code, dcode in zip(values, codes, dcodes)]
+
+
+# byte translation tables from a code column to its display codes and to its struct format
+_CLEAR_INT_FLAG = bytearray(code & ~INT_FLAG for code in range(256))
+_VALUE_FORMATS = bytearray(ord("q") if code & INT_FLAG else ord("d") for code in range(256))
+
+
+class TemperatureFile(object):
+    """
+    A memory-mapped, read-only temperature series file. Opening it only reads the header;
+    records are read from the mapping when accessed.
+
+    series = TemperatureFile("readings.tser")
+    series[10**9]          -> the Temperature at that position
+    series[5000:6000]      -> a list of those Temperatures
+    series.values          -> zero-copy numpy view of the value column (requires numpy)
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("'{0}' is not a temperature series file".format(path))
+            magic, version, flags, count = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError("'{0}' is not a temperature series file".format(path))
+            if version != VERSION:
+                raise ValueError("Unsupported temperature series version {0}".format(version))
+            self.__count = count
+            self.__has_dscale = bool(flags & HAS_DSCALE)
+            size = _HEADER.size + count * (10 if self.__has_dscale else 9)
+            f.seek(0, 2)
+            if f.tell() < size:
+                raise ValueError("'{0}' is truncated".format(path))
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        self.__codes_offset = _HEADER.size + 8 * count
+        self.__dcodes_offset = self.__codes_offset + count
+        self.__closed = False
+        self.__exported = False  # whether column views of the mapping were handed out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file, unless column views of it were handed out: those keep the mapping alive
+        (it's their numpy base) until they are garbage collected, as unmapping under them would crash.
+        """
+        if self.__map is not None and not self.__exported:
+            self.__map.close()
+        self.__map = None
+        self.__closed = True
+
+    def __check_open(self):
+        if self.__closed:
+            raise ValueError("I/O operation on a closed TemperatureFile")
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def has_dscale(self):
+        return self.__has_dscale
+
+    def __record(self, i):
+        """
+        builds the Temperature at position i
+        """
+        self.__check_open()
+        mm = self.__map
+        value, = struct.unpack_from("<d", mm, _HEADER.size + 8 * i)
+        code = ord(mm[self.__codes_offset + i])
+        if code & INT_FLAG:
+            value = int(value)
+        scale = Temperature.SCALES[code & ~INT_FLAG]
+        dscale = Temperature.SCALES[ord(mm[self.__dcodes_offset + i])] if self.__has_dscale else scale
+        return Temperature._from_fields(value, scale, dscale)
+
+    def __getitem__(self, index):
+        """
+        an integer index returns a Temperature, a slice returns a list of Temperatures
+        """
+        if isinstance(index, slice):
+            return [self.__record(i) for i in xrange(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError("temperature series index out of range")
+        return self.__record(index)
+
+    def __iter__(self):
+        for i in xrange(self.__count):
+            yield self.__record(i)
+
+    def __column(self, offset, dtype):
+        if np is None:
+            raise ImportError("numpy is required for column views")
+        self.__check_open()
+        if self.__map is None:
+            return np.empty(0, dtype=dtype)
+        self.__exported = True
+        return np.frombuffer(self.__map, dtype=dtype, count=self.__count, offset=offset)
+
+    @property
+    def values(self):
+        """
+        zero-copy read-only view of the value column
+        """
+        return self.__column(_HEADER.size, "<f8")
+
+    @property
+    def codes(self):
+        """
+        zero-copy read-only view of the scale code column, bit 7 flags int values
+        """
+        return self.__column(self.__codes_offset, np.uint8 if np is not None else None)
+
+    @property
+    def dcodes(self):
+        """
+        zero-copy read-only view of the display scale code column; without one (has_dscale False)
+        a uint8 copy of the scale codes, without the int flag
+        """
+        if not self.__has_dscale:
+            return (self.codes & ~INT_FLAG).astype(np.uint8)
+        return self.__column(self.__dcodes_offset, np.uint8 if np is not None else None)
+
+    def to_array(self, start=0, stop=None):
+        """
+        returns records [start, stop) as a TemperatureArray
+        """
+        from temperature_array import TemperatureArray
+        stop = self.__count if stop is None else stop
+        return TemperatureArray(self.values[start:stop], self.codes[start:stop] & ~INT_FLAG,
+                                self.dcodes[start:stop] & ~INT_FLAG)
@@ -1,4 +1,9 @@
+import cPickle
+import pickle
+import threading
 import unittest
+from fractions import Fraction
+import temperature
 from temperature import Temperature
 
 
@@ -54,6 +59,131 @@ class TestSetDefaultScaleErrors(unittest.TestCase):
                 Temperature.set_default_scale("a")
 
 
+class TestScopedDefaultScale(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_scoped(self):
+        with Temperature.scoped_default_scale(" f") as scale:
+            self.assertEquals(scale, "F")
+            self.assertEquals(Temperature.get_default_scale(), "F")
+            self.assertEquals(str(Temperature(72)), "72F")
+            self.assertEquals(str(Temperature("72")), "72F")
+            self.assertEquals(str(Temperature("72k")), "72K")
+            self.assertEquals(Temperature.parse_many(["1"])[1], [1])
+            with Temperature.scoped_default_scale("k"):
+                self.assertEquals(str(Temperature()), "0K")
+            self.assertEquals(str(Temperature()), "0F")
+        self.assertEquals(Temperature.DEFAULT_SCALE, "C")
+        self.assertEquals(str(Temperature(72)), "72C")
+
+    def test_restored_on_error(self):
+        with self.assertRaises(ZeroDivisionError):
+            with Temperature.scoped_default_scale("F"):
+                1 / 0
+        self.assertEquals(Temperature.get_default_scale(), "C")
+
+    def test_overrides_global(self):
+        with Temperature.scoped_default_scale("K"):
+            Temperature.set_default_scale("F")
+            self.assertEquals(str(Temperature(1)), "1K")
+        self.assertEquals(str(Temperature(1)), "1F")
+
+    def test_threads(self):
+        barrier = threading.Event()
+        results = {}
+
+        def construct(scale):
+            with Temperature.scoped_default_scale(scale):
+                barrier.wait()
+                results[scale] = [Temperature(i).scale for i in range(1000)]
+
+        threads = [threading.Thread(target=construct, args=(scale,)) for scale in "FK"]
+        for thread in threads:
+            thread.start()
+        barrier.set()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(results, {"F": ["F"] * 1000, "K": ["K"] * 1000})
+        self.assertEquals(Temperature(1).scale, "C")
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            with Temperature.scoped_default_scale(None):
+                pass
+        with self.assertRaises(ValueError):
+            with Temperature.scoped_default_scale("x"):
+                pass
+        self.assertEquals(Temperature.get_default_scale(), "C")
+
+
+class TestRegisteredScales(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_builtin(self):
+        self.assertEquals(Temperature.SCALES[:3], ("C", "F", "K"))
+        for text, celsius in [("491.67R", 0), ("671.67r", 100), ("0D", 100), ("150d", 0), ("33N", 100), ("0 n", 0)]:
+            self.assertAlmostEquals(Temperature(text).kelvin - 273.15, celsius)
+        f, r = Temperature("100F"), Temperature("559.67R")
+        f.dscale = r.dscale = "c"
+        self.assertAlmostEquals(f.dvalue, r.dvalue)  # the x2y functions and the composed converters agree
+        t = Temperature("100C")
+        for dscale, expected in [("r", "671.67R"), ("D", "0.0D"), ("n", "33.0N")]:
+            t.dscale = dscale
+            self.assertEquals(str(t), expected)
+        t.scale = "r"
+        Temperature.set_default_scale("n")
+        self.assertEquals(repr(Temperature(1)), "1N")
+        self.assertEquals(Temperature.parse_many(["1d"])[1], [Temperature.SCALES.index("D")])
+
+    def test_composed(self):
+        for from_ in Temperature.SCALES:
+            for to in Temperature.SCALES:
+                convert = temperature._CONVERSIONS[(from_, to)]
+                back = temperature._CONVERSIONS[(to, from_)]
+                self.assertAlmostEquals(back(convert(36.6)), 36.6)
+                self.assertAlmostEquals(temperature._TO_KELVIN[to](convert(36.6)), temperature._TO_KELVIN[from_](36.6))
+
+    def test_register(self):
+        saved = (Temperature.SCALES, dict(temperature._AFFINE), dict(temperature._CONVERSIONS),
+                 dict(temperature._TO_KELVIN), temperature._TEMPERATURE_RE)
+        try:
+            Temperature.register_scale("w", Fraction(1, 2), 100)
+            self.assertEquals(Temperature.SCALES[-1], "W")
+            self.assertEquals(Temperature("10w").kelvin, 105)
+            self.assertEquals(Temperature("10w"), Temperature("105K"))
+            t = Temperature("105k")
+            t.dscale = "w"
+            self.assertEquals(str(t), "10.0W")
+            with self.assertRaises(ValueError):
+                Temperature.register_scale("W", 1, 0)
+        finally:
+            Temperature.SCALES = saved[0]
+            for table, old in zip([temperature._AFFINE, temperature._CONVERSIONS, temperature._TO_KELVIN], saved[1:4]):
+                table.clear()
+                table.update(old)
+            temperature._TEMPERATURE_RE = saved[4]
+        with self.assertRaises(ValueError):
+            Temperature("10w")
+
+    def test_register_errors(self):
+        for name, factor, offset, error in [("C", 1, 0, ValueError), ("", 1, 0, ValueError), ("WW", 1, 0, ValueError),
+                                            ("1", 1, 0, ValueError), (None, 1, 0, ValueError), ("W", 0, 0, ValueError),
+                                            ("W", "1", 0, TypeError), ("W", 1, float("nan"), ValueError)]:
+            with self.assertRaises(error):
+                Temperature.register_scale(name, factor, offset)
+        self.assertEquals(Temperature.SCALES, ("C", "F", "K", "R", "D", "N"))
+
+
 class TestConstructor(unittest.TestCase):
     def setUp(self):
         self.__oldDefaultScale = Temperature.DEFAULT_SCALE
@@ -125,6 +255,103 @@ class TestConstructorErrors(unittest.TestCase):
             t = Temperature("10..0f")
 
 
+class TestParseMany(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_1(self):
+        values, codes, bad = Temperature.parse_many(["10.5f", " 3 ", "-40K", "1e3", "7 c"])
+        self.assertEquals(values, [10.5, 3, -40, 1000.0, 7])
+        self.assertEquals([Temperature.SCALES[c] for c in codes], ["F", "C", "K", "C", "C"])
+        self.assertEquals(bad, [])
+
+    def test_2(self):  # bad rows are reported by index
+        values, codes, bad = Temperature.parse_many(["100u", "12", "", "10..0f", None, "1e3k", "xyz"])
+        self.assertEquals(values, [12])
+        self.assertEquals(bad, [0, 2, 3, 4, 5, 6])
+
+    def test_3(self):  # newline separated buffer
+        values, codes, bad = Temperature.parse_many("1c\n2.5F\n\n3")
+        self.assertEquals(values, [1, 2.5, 3])
+        self.assertEquals(codes, [0, 1, 0])
+        self.assertEquals(bad, [2])
+
+    def test_4(self):  # bare numbers take the default scale
+        Temperature.set_default_scale("k")
+        values, codes, bad = Temperature.parse_many(["5", "5f"])
+        self.assertEquals(codes, [2, 1])
+
+    def test_5(self):  # same grammar as the constructor
+        for s in ["100", "100.", "100.k", "- 5", "+.5e1 f", "inf", "-Infinity", "nan", "33.3 k"]:
+            t = Temperature(s)
+            values, codes, bad = Temperature.parse_many([s])
+            self.assertEquals(repr(values[0]), repr(t.value))
+            self.assertEquals(Temperature.SCALES[codes[0]], t.scale)
+        for s in ["1e3k", "infk", "1.5.c", ".c", "c", "5 5"]:
+            with self.assertRaises(ValueError):
+                Temperature(s)
+            self.assertEquals(Temperature.parse_many([s])[2], [0])
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        Temperature.enable_parse_cache(2)
+
+    def tearDown(self):
+        Temperature.disable_parse_cache()
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_1(self):
+        self.assertEquals(repr(Temperature("21.5C")), "21.5C")
+        self.assertEquals(repr(Temperature("21.5C")), "21.5C")
+        info = Temperature.parse_cache_info()
+        self.assertEquals((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_2(self):  # least recently used entries are evicted
+        Temperature("1c")
+        Temperature("2c")
+        Temperature("1c")
+        Temperature("3c")  # evicts "2c"
+        Temperature("1c")
+        Temperature("2c")
+        info = Temperature.parse_cache_info()
+        self.assertEquals((info.hits, info.misses, info.evictions, info.currsize), (2, 4, 2, 2))
+
+    def test_3(self):  # bare numbers follow the default scale
+        self.assertEquals(repr(Temperature("21")), "21C")
+        Temperature.set_default_scale("f")
+        self.assertEquals(repr(Temperature("21")), "21F")
+        self.assertEquals(Temperature.parse_cache_info().hits, 1)
+
+    def test_4(self):  # invalid strings still raise, and aren't cached
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                Temperature("100u")
+        self.assertEquals(Temperature.parse_cache_info().currsize, 0)
+
+    def test_5(self):
+        values, codes, bad = Temperature.parse_many(["1c", "1c", "x"])
+        self.assertEquals((values, bad), ([1, 1], [2]))
+        self.assertEquals(Temperature.parse_cache_info().hits, 1)
+
+    def test_6(self):
+        Temperature.disable_parse_cache()
+        self.assertEquals(Temperature.parse_cache_info(), None)
+        self.assertEquals(repr(Temperature(" 7k ")), "7K")
+
+    def test_7(self):
+        with self.assertRaises(ValueError):
+            Temperature.enable_parse_cache(0)
+        with self.assertRaises(TypeError):
+            Temperature.enable_parse_cache("10")
+
+
 class TestConverters(unittest.TestCase):
     def test_c2c(self):
         self.assertEquals(Temperature.c2c(100), 100)
@@ -137,6 +364,9 @@ class TestConverters(unittest.TestCase):
 
     def test_f2c(self):
         self.assertEquals(Temperature.f2c(68), 20)
+        self.assertAlmostEquals(Temperature.f2c(100), 37.77777777777778)
+        self.assertAlmostEquals(Temperature.f2c(33), 0.5555555555555556)
+        self.assertEquals(repr(Temperature.f2c(32)), "0")
 
     def test_f2f(self):
         self.assertEquals(Temperature.f2f(100), 100)
@@ -289,6 +519,88 @@ class TestValueSetterError(unittest.TestCase):
             t.value = "30h"
 
 
+class TestKelvin(unittest.TestCase):
+    def test_1(self):
+        t = Temperature("32F")
+        self.assertEquals(t.kelvin, 273.15)
+        t.dscale = "c"
+        self.assertEquals(t.kelvin, 273.15)
+
+    def test_2(self):  # setting scale invalidates the key
+        t = Temperature("0C")
+        self.assertEquals(t.kelvin, 273.15)
+        t.scale = "k"
+        self.assertEquals(t.kelvin, 0)
+
+    def test_3(self):  # setting value invalidates the key
+        t = Temperature("0C")
+        self.assertEquals(t.kelvin, 273.15)
+        t.value = "10k"
+        self.assertEquals(t.kelvin, 10)
+
+    def test_4(self):  # arithmetic results get their own key
+        t1 = Temperature("10C")
+        t1.kelvin
+        t2 = t1 + 5
+        self.assertEquals(t2.kelvin, 288.15)
+
+
+class TestDvalueCache(unittest.TestCase):
+    def test_1(self):  # setting dscale invalidates the cached dvalue
+        t = Temperature("100C")
+        self.assertEquals(t.dvalue, 100)
+        t.dscale = "f"
+        self.assertEquals(t.dvalue, 212)
+        self.assertEquals(str(t), "212.0F")
+
+    def test_2(self):  # setting scale invalidates the cached dvalue
+        t = Temperature("0C")
+        t.dscale = "k"
+        self.assertEquals(t.dvalue, 273.15)
+        t.scale = "k"
+        self.assertEquals(t.dvalue, 0)
+
+    def test_3(self):  # setting value invalidates the cached dvalue
+        t = Temperature("0C")
+        self.assertEquals(str(t), "0C")
+        t.value = "10k"
+        self.assertEquals(str(t), "10K")
+
+    def test_4(self):  # arithmetic results get their own dvalue
+        t1 = Temperature("10C")
+        t1.dvalue
+        self.assertEquals((t1 + 5).dvalue, 15)
+        self.assertEquals((t1 - Temperature("0k")).dvalue, 283.15)
+
+
+class TestPickle(unittest.TestCase):
+    def test_1(self):
+        t = Temperature("10.5f")
+        t.dscale = "k"
+        for module in (pickle, cPickle):
+            for protocol in range(3):
+                copy = module.loads(module.dumps(t, protocol))
+                self.assertEquals((copy.value, copy.scale, copy.dscale, str(copy)), (10.5, "F", "K", str(t)))
+        self.assertEquals(type(cPickle.loads(cPickle.dumps(Temperature(3), 2)).value), int)
+
+    def test_subclass(self):
+        t = TaggedTemperature("3k")
+        t.site = "roof"
+        copy = cPickle.loads(cPickle.dumps(t, 2))
+        self.assertEquals((type(copy), repr(copy), copy.site), (TaggedTemperature, "3K", "roof"))
+
+
+class TaggedTemperature(Temperature):  # a subclass with a __dict__, picklable since it's module level
+    pass
+
+
+class TestSortKey(unittest.TestCase):
+    def test_1(self):
+        l = [Temperature("100F"), Temperature("0k"), Temperature("0c"), Temperature("300K")]
+        self.assertEquals([repr(t) for t in sorted(l, key=Temperature.sort_key)], ["0K", "0C", "300K", "100F"])
+        self.assertEquals(sorted(l, key=Temperature.sort_key), sorted(l))
+
+
 class TestAdd(unittest.TestCase):
     def setUp(self):
         Temperature.set_default_scale("C")
@@ -355,6 +667,130 @@ class TestAdd(unittest.TestCase):
         self.assertEquals(t.value, 0)
 
 
+class TestSum(unittest.TestCase):
+    def setUp(self):
+        Temperature.set_default_scale("C")
+
+    def assertSameAsReduce(self, temps):
+        expected = reduce(lambda a, b: a + b, temps)
+        result = Temperature.sum(temps)
+        self.assertAlmostEquals(result.value, expected.value, 9)
+        self.assertEquals(type(result.value), type(expected.value))
+        self.assertEquals(result.scale, expected.scale)
+        self.assertEquals(result.dscale, expected.dscale)
+
+    def test_1(self):  # same scale, int values stay ints
+        t = Temperature.sum([Temperature("10C"), Temperature("20C"), Temperature("-5c")])
+        self.assertEquals(repr(t), "25C")
+
+    def test_2(self):  # display scale of the first one
+        t1 = Temperature("32F")
+        t1.dscale = "c"
+        self.assertSameAsReduce([t1, Temperature("1.5F"), 3])
+
+    def test_3(self):  # mixed scales fall back to Kelvin from the first scale change on
+        self.assertSameAsReduce([Temperature("0C"), Temperature("32F")])
+        self.assertSameAsReduce([Temperature("0C"), Temperature("0C"), Temperature("32F")])
+        self.assertSameAsReduce([Temperature("0C"), Temperature("32F"), Temperature("0C"), 5,
+                                 Temperature("10K"), Temperature("-40.5F")])
+        self.assertSameAsReduce([Temperature("1K"), Temperature("2K"), Temperature("3C")])
+
+    def test_4(self):
+        self.assertEquals(repr(Temperature.sum([])), "0C")
+        self.assertEquals(repr(Temperature.sum(iter([Temperature("7k")]))), "7K")
+        self.assertEquals(repr(Temperature.sum([2, Temperature("3C")])), "5C")
+
+    def test_5(self):  # compensated summation
+        t = Temperature.sum([Temperature(0.1)] * 10)
+        self.assertEquals(t.value, 1.0)
+
+    def test_6(self):
+        with self.assertRaises(TypeError):
+            Temperature.sum([Temperature(), "1C"])
+        with self.assertRaises(TypeError):
+            Temperature.sum(["1C"])
+
+
+class TestMean(unittest.TestCase):
+    def setUp(self):
+        Temperature.set_default_scale("C")
+
+    def test_1(self):
+        t1 = Temperature("10C")
+        t1.dscale = "F"
+        t = Temperature.mean([t1, Temperature("15C")])
+        self.assertEquals(repr(t), "12.5C")
+        self.assertEquals(t.dscale, "F")
+
+    def test_2(self):  # mixed scales average in Kelvin
+        t = Temperature.mean([Temperature("0C"), Temperature("212F"), Temperature("273.15K")])
+        self.assertAlmostEquals(t.value, 306.483333333, 6)
+        self.assertEquals(t.scale, "K")
+        self.assertEquals(t.dscale, "K")
+
+    def test_3(self):
+        with self.assertRaises(ValueError):
+            Temperature.mean([])
+        with self.assertRaises(TypeError):
+            Temperature.mean([Temperature(), 1])
+
+
+class TestHash(unittest.TestCase):
+    def test_1(self):
+        self.assertEquals(hash(Temperature("0C")), hash(Temperature("32F")))
+        self.assertEquals(hash(Temperature("0k")), hash(Temperature("0.0K")))
+        mixed = {0: "a", Temperature("0K"): "b", None: "c"}
+        self.assertEquals(mixed[Temperature("-273.15C")], "b")
+        self.assertEquals(mixed[0], "a")
+        self.assertFalse(Temperature("1C") == None)
+        self.assertTrue(Temperature("1C") != None)
+        self.assertFalse(Temperature("1C") == "1C")
+        self.assertEquals(len(set([Temperature("0C"), Temperature("32F"), Temperature("273.15K"), Temperature("1C")])), 2)
+        self.assertEquals({Temperature("0C"): "freezing"}[Temperature("32F")], "freezing")
+
+    def test_order_errors(self):
+        for other in (5, None, "1C"):
+            with self.assertRaises(TypeError):
+                Temperature("1C") < other
+            with self.assertRaises(TypeError):
+                Temperature("1C") >= other
+        with self.assertRaises(TypeError):
+            sorted([Temperature("1C"), 3, "x"])
+
+
+class TestUnique(unittest.TestCase):
+    def test_1(self):
+        temps = [Temperature("1C"), Temperature("0C"), Temperature("32F"), Temperature("1c"), Temperature("274.15K")]
+        self.assertEquals([repr(t) for t in Temperature.unique(temps)], ["1C", "0C"])
+        self.assertEquals(Temperature.unique([]), [])
+
+    def test_resolution(self):
+        temps = [Temperature("100C"), Temperature("212F"), Temperature("100.4C")]
+        self.assertEquals(len(Temperature.unique(temps)), 3)  # 212F is 373.15000000000003K
+        self.assertEquals([repr(t) for t in Temperature.unique(temps, 1e-9)], ["100C", "100.4C"])
+        self.assertEquals([repr(t) for t in Temperature.unique(temps, 10)], ["100C"])
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            Temperature.unique([Temperature(1), 1])
+        with self.assertRaises(ValueError):
+            Temperature.unique([], 0)
+
+
+class TestGroupBy(unittest.TestCase):
+    def test_1(self):
+        groups = Temperature.group_by([Temperature("0C"), Temperature("1C"), Temperature("32F")])
+        self.assertEquals(groups.keys(), [273.15, 274.15])
+        self.assertEquals([repr(t) for t in groups[273.15]], ["0C", "32F"])
+
+    def test_resolution(self):
+        groups = Temperature.group_by([Temperature("10.2K"), Temperature("9.9K"), Temperature("11K")], 0.5)
+        self.assertEquals(groups.keys(), [10.0, 11.0])
+        self.assertEquals([repr(t) for t in groups[10.0]], ["10.2K", "9.9K"])
+        with self.assertRaises(ValueError):
+            Temperature.group_by([], -1)
+
+
 class TestAddError(unittest.TestCase):
     def test_1(self):
         with self.assertRaises(TypeError):
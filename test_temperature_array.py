@@ -0,0 +1,149 @@
+import unittest
+from temperature import Temperature
+from temperature_array import TemperatureArray
+
+
+class TestConstructor(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_default_scale(self):
+        a = TemperatureArray([1, 2])
+        self.assertEquals(a.dscale, ["C", "C"])
+        self.assertEquals(str(a), "[1.0C, 2.0C]")
+
+    def test_single_scale(self):
+        a = TemperatureArray([1, 2.5], "f")
+        self.assertEquals(repr(a), "TemperatureArray([1.0F, 2.5F])")
+
+    def test_mixed_scales(self):
+        a = TemperatureArray([0, 32, 273.15], ["c", "F", "K"], "k")
+        self.assertEquals(a.dscale, ["K", "K", "K"])
+        self.assertEquals(list(a.codes), [0, 1, 2])
+
+    def test_type_error(self):
+        with self.assertRaises(TypeError):
+            TemperatureArray([1], [1.5])
+
+    def test_value_error1(self):  # invalid scale
+        with self.assertRaises(ValueError):
+            TemperatureArray([1], "x")
+
+    def test_value_error2(self):  # wrong number of scales
+        with self.assertRaises(ValueError):
+            TemperatureArray([1, 2], ["C"])
+
+
+class TestTemperatureList(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_round_trip(self):
+        temps = [Temperature("10.5f"), Temperature("0c"), Temperature("300.0K")]
+        temps[1].dscale = "F"
+        a = TemperatureArray.from_temperatures(temps)
+        back = a.to_temperatures()
+        self.assertEquals([repr(t) for t in back], ["10.5F", "0.0C", "300.0K"])
+        self.assertEquals([t.dscale for t in back], ["F", "F", "K"])
+
+    def test_parse(self):
+        a, bad = TemperatureArray.parse(["10.5f", "x", "300K", "12"])
+        self.assertEquals(repr(a), "TemperatureArray([10.5F, 300.0K, 12.0C])")
+        self.assertEquals(bad, [1])
+
+    def test_getitem(self):
+        a = TemperatureArray([1, 2, 3], ["C", "F", "K"])
+        self.assertEquals(repr(a[1]), "2.0F")
+        self.assertEquals(repr(a[1:]), "TemperatureArray([2.0F, 3.0K])")
+        self.assertEquals(repr(a[a.values > 1.5]), "TemperatureArray([2.0F, 3.0K])")
+
+
+class TestConversion(unittest.TestCase):
+    def test_to_scale(self):
+        a = TemperatureArray([0, 32, 0], ["C", "F", "K"]).to_scale("k")
+        self.assertEquals(a.dscale, ["K", "K", "K"])
+        self.assertEquals(list(a.values), [273.15, 273.15, 0])
+
+    def test_dvalues_match_scalar(self):
+        temps = [Temperature("37.5c"), Temperature("-40.0F"), Temperature("10.0K")]
+        for scale in "CFK":
+            for t in temps:
+                t.dscale = scale
+            a = TemperatureArray.from_temperatures(temps)
+            self.assertEquals(list(a.dvalues), [t.dvalue for t in temps])
+
+    def test_dscale_setter(self):
+        a = TemperatureArray([0, 32], ["C", "F"])
+        a.dscale = "K"
+        self.assertEquals(list(a.dvalues), [273.15, 273.15])
+        a.dscale = ["F", "C"]
+        self.assertEquals(str(a), "[32.0F, 0.0C]")
+
+
+class TestArithmetic(unittest.TestCase):
+    def test_add_number(self):
+        a = TemperatureArray([1, 2], ["C", "F"]) + 5
+        self.assertEquals(repr(a), "TemperatureArray([6.0C, 7.0F])")
+
+    def test_sub_number(self):
+        a = TemperatureArray([1, 2], ["C", "F"]) - 0.5
+        self.assertEquals(repr(a), "TemperatureArray([0.5C, 1.5F])")
+
+    def test_add_matches_scalar(self):
+        left = [Temperature("32.0F"), Temperature("273.15K"), Temperature("10.0C")]
+        right = [Temperature("0.0C"), Temperature("0.0C"), Temperature("30.0C")]
+        left[2].dscale = "F"
+        a = TemperatureArray.from_temperatures(left) + TemperatureArray.from_temperatures(right)
+        expected = [l + r for l, r in zip(left, right)]
+        self.assertEquals([repr(t) for t in a], [repr(t) for t in expected])
+        self.assertEquals(a.dscale, [t.dscale for t in expected])
+
+    def test_sub_matches_scalar(self):
+        left = [Temperature("32.0F"), Temperature("273.15K"), Temperature("10.0C")]
+        right = Temperature("0.0C")
+        a = TemperatureArray.from_temperatures(left) - right
+        self.assertEquals([repr(t) for t in a], [repr(l - right) for l in left])
+
+    def test_type_error(self):
+        with self.assertRaises(TypeError):
+            TemperatureArray([1]) + "1"
+
+    def test_length_error(self):
+        with self.assertRaises(ValueError):
+            TemperatureArray([1]) + TemperatureArray([1, 2])
+
+
+class TestComparisons(unittest.TestCase):
+    def setUp(self):
+        self.a = TemperatureArray([0, 273.15, 32, 100, 100], ["C", "K", "F", "C", "F"])
+        self.t = Temperature("32.0F")
+
+    def test_equal(self):
+        self.assertEquals(list(self.a == self.t), [True, True, True, False, False])
+
+    def test_notequal(self):
+        self.assertEquals(list(self.a != self.t), [False, False, False, True, True])
+
+    def test_less_than(self):
+        self.assertEquals(list(self.a < TemperatureArray([1] * 5, "C")), [True, True, True, False, False])
+
+    def test_less_than_or_equal(self):
+        self.assertEquals(list(self.a <= self.t), [True, True, True, False, False])
+
+    def test_greater_than(self):
+        self.assertEquals(list(self.a > self.t), [False, False, False, True, True])
+
+    def test_greater_than_or_equal(self):
+        self.assertEquals(list(self.a >= Temperature("100F")), [False, False, False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
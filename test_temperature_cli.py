@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+import unittest
+from StringIO import StringIO
+from temperature import Temperature
+import temperature_cli
+from temperature_cli import main
+
+
+class TestTemperatureCli(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "w") as f:
+            f.write("10C\n50F\nbogus\n283.15K\n-40\n32F\n")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+        os.remove(self.path)
+
+    def run_main(self, argv, stdin=""):
+        stdout, stderr = StringIO(), StringIO()
+        status = main(argv, StringIO(stdin), stdout, stderr)
+        return status, stdout.getvalue().splitlines(), stderr.getvalue()
+
+    def test_convert(self):
+        status, lines, errors = self.run_main(["-t", "F", self.path])
+        self.assertEquals(status, 0)
+        self.assertEquals(lines, ["50.0F", "50F", "50.0F", "-40.0F", "32F"])
+        self.assertEquals(errors, "1 lines failed to parse\n")
+        _, lines, _ = self.run_main(["-t", "k", "-d", "f", "-p", "2", "-"], "32\n0C\n")
+        self.assertEquals(lines, ["273.15K", "273.15K"])
+        _, lines, _ = self.run_main([self.path, "-"], "1K\n")
+        self.assertEquals(lines[-1], "-272.15C")
+        self.assertEquals(len(lines), 6)
+        _, lines, _ = self.run_main(["-t", "c", "-p", "2"], "100F\n33F\n")
+        self.assertEquals(lines, ["37.78C", "0.56C"])
+
+    def test_sort_unique(self):
+        _, lines, _ = self.run_main(["-s", "-p", "1", self.path])
+        self.assertEquals(lines, ["-40.0C", "0.0C", "10.0C", "10.0C", "10.0C"])
+        _, lines, _ = self.run_main(["-u", self.path])
+        self.assertEquals(lines, ["10C", "-40C", "0C"])
+
+    def test_sort_spills(self):
+        rnd = random.Random(3)
+        values = [rnd.randint(-50, 50) for i in range(500)]
+        stdin = "".join("{0}C\n".format(v) for v in values)
+        _, lines, _ = self.run_main(["-s", "-c", "37"], stdin)
+        self.assertEquals(lines, ["{0}C".format(v) for v in sorted(values)])
+        _, lines, _ = self.run_main(["-s", "-u", "-c", "37"], stdin)
+        self.assertEquals(lines, ["{0}C".format(v) for v in sorted(set(values))])
+        old_width = temperature_cli._MERGE_WIDTH
+        temperature_cli._MERGE_WIDTH = 3  # 14 runs, merged in 3 passes
+        try:
+            _, lines, _ = self.run_main(["-s", "-c", "37"], stdin)
+        finally:
+            temperature_cli._MERGE_WIDTH = old_width
+        self.assertEquals(lines, ["{0}C".format(v) for v in sorted(values)])
+
+    def test_aggregate(self):
+        _, lines, _ = self.run_main(["-a", "-t", "c", "-c", "2", self.path])
+        stats = dict(line.split("\t") for line in lines)
+        self.assertEquals(stats["count"], "5")
+        self.assertEquals(stats["min"], "-40.0C")
+        self.assertEquals(stats["max"], "10.0C")
+        _, lines, _ = self.run_main(["-a"], "")
+        self.assertEquals(lines, ["count\t0"])
+
+    def test_stats(self):
+        _, _, errors = self.run_main(["--stats", self.path])
+        self.assertTrue(errors.splitlines()[-1].startswith("6 lines, 5 converted, 1 bad in "))
+
+    def test_errors(self):
+        stderr = StringIO()
+        with self.assertRaises(SystemExit):
+            main(["-t", "x"], StringIO(), StringIO(), stderr)
+        with self.assertRaises(SystemExit):
+            main(["-c", "0"], StringIO(), StringIO(), stderr)
+        with self.assertRaises(SystemExit):
+            main(["-w", "-1"], StringIO(), StringIO(), stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from temperature import Temperature
+from temperature_fixed import FixedTemperature
+
+
+class TestFixedTemperature(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_constructor(self):
+        self.assertEquals(str(FixedTemperature()), "0.0C")
+        self.assertEquals(FixedTemperature().ticks, 273150)
+        self.assertEquals(str(FixedTemperature("10.5f")), "10.5F")
+        self.assertEquals(FixedTemperature(300, "k").ticks, 300000)
+        self.assertEquals(repr(FixedTemperature(Temperature("20C"), resolution=100)), "20.0C")
+        self.assertEquals(FixedTemperature("1K", resolution=1).ticks, 1)
+        self.assertEquals(FixedTemperature.from_ticks(1500).kelvin, 1.5)
+        self.assertEquals(str(FixedTemperature(300, "k")), "300.0K")
+        self.assertEquals(str(FixedTemperature("0F")), "0.0F")
+        self.assertEquals(str(FixedTemperature("0D")), "0.0D")
+        self.assertEquals(str(FixedTemperature("-0.0C")), "0.0C")
+
+    def test_exact(self):
+        self.assertEquals(FixedTemperature("0.1C") + FixedTemperature("0.2C"), FixedTemperature("0.3C"))
+        self.assertEquals(FixedTemperature("32F"), FixedTemperature("0C"))
+        self.assertEquals(FixedTemperature("212F"), FixedTemperature("373.15K"))
+        self.assertEquals(hash(FixedTemperature("212F")), hash(FixedTemperature("100C")))
+        self.assertEquals(FixedTemperature("0C", resolution=100), FixedTemperature("0C"))
+        self.assertEquals(FixedTemperature("0D"), FixedTemperature("100C"))  # registered scales are exact too
+        self.assertEquals(FixedTemperature("491.67R"), FixedTemperature("0C"))
+        self.assertEquals(str(FixedTemperature("150d")), "150.0D")
+        t = FixedTemperature("98.6F")
+        t.dscale = "c"
+        self.assertEquals(t.dvalue, 37.0)
+        t.dscale = "f"
+        self.assertEquals(str(t), "98.6F")
+
+    def test_arithmetic(self):
+        t = FixedTemperature("10C")
+        t.dscale = "k"
+        self.assertEquals(str(t + 5), "288.15K")
+        self.assertEquals(repr(t - 5), "5.0C")
+        self.assertEquals(repr(FixedTemperature("10F") + 9), "19.0F")
+        self.assertEquals(repr(FixedTemperature("10C") + FixedTemperature("5C")), "15.0C")
+        self.assertEquals(repr(FixedTemperature("10C") - FixedTemperature("5C")), "5.0C")
+        self.assertEquals(repr(FixedTemperature("0C") + FixedTemperature("10K")), "283.15K")
+        self.assertEquals(repr(FixedTemperature("50F") - FixedTemperature("0C")), "10.0K")
+        self.assertEquals((FixedTemperature("50F") + FixedTemperature("50F")).dvalue, 100.0)
+
+    def test_compare(self):
+        temps = [FixedTemperature("100F"), FixedTemperature("0k"), FixedTemperature("0c"), FixedTemperature("300K")]
+        self.assertEquals([repr(t) for t in sorted(temps)], ["0.0K", "0.0C", "300.0K", "100.0F"])
+        self.assertTrue(FixedTemperature("0C") < FixedTemperature("1C", resolution=10))
+        self.assertTrue(FixedTemperature("0C") != FixedTemperature("0K"))
+        self.assertFalse(FixedTemperature("0C") == 273.15)
+
+    def test_to_temperature(self):
+        t = FixedTemperature("10.5f")
+        t.dscale = "c"
+        temperature = t.to_temperature()
+        self.assertEquals(repr(temperature), "10.5F")
+        self.assertEquals(temperature.dscale, "C")
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            FixedTemperature("10x")
+        with self.assertRaises(ValueError):
+            FixedTemperature("10C", "F")
+        with self.assertRaises(ValueError):
+            FixedTemperature(float("inf"))
+        with self.assertRaises(ValueError):
+            FixedTemperature(1, resolution=0)
+        with self.assertRaises(TypeError):
+            FixedTemperature([1])
+        with self.assertRaises(ValueError):
+            FixedTemperature("1C") + FixedTemperature("1C", resolution=10)
+        with self.assertRaises(TypeError):
+            FixedTemperature("1C") + "1C"
+        with self.assertRaises(TypeError):
+            FixedTemperature("1C") < 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from temperature import Temperature
+from temperature_index import TemperatureIndex
+
+
+class TestTemperatureIndex(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        self.temps = [Temperature(s) for s in ["100F", "0k", "0c", "300K", "30C", "95F", "32F"]]
+        self.index = TemperatureIndex(self.temps)
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_sorted(self):
+        self.assertEquals([repr(t) for t in self.index], ["0K", "0C", "32F", "300K", "30C", "95F", "100F"])
+        self.assertEquals(len(self.index), 7)
+
+    def test_range_inclusive(self):
+        self.assertEquals([repr(t) for t in self.index.range("30C", "95F")], ["30C", "95F"])
+
+    def test_range_exclusive(self):
+        result = self.index.range("30C", "95F", inclusive=(False, False))
+        self.assertEquals(result, [])
+        result = self.index.range(Temperature("0C"), "30C", inclusive=(False, True))
+        self.assertEquals([repr(t) for t in result], ["300K", "30C"])
+
+    def test_range_unbounded(self):
+        self.assertEquals([repr(t) for t in self.index.range(high="0c")], ["0K", "0C", "32F"])
+        self.assertEquals([repr(t) for t in self.index.range("95F")], ["95F", "100F"])
+        self.assertEquals(self.index.count("0C", "32F"), 2)
+
+    def test_range_empty(self):
+        self.assertEquals(self.index.range("100C", "0C"), [])
+
+    def test_nearest(self):
+        self.assertEquals([repr(t) for t in self.index.nearest("300K")], ["300K"])
+        self.assertEquals([repr(t) for t in self.index.nearest("300K", 3)], ["300K", "30C", "95F"])
+        self.assertEquals([repr(t) for t in self.index.nearest(-1000, 2)], ["0K", "0C"])
+        self.assertEquals(len(self.index.nearest("0C", 100)), 7)
+
+    def test_add_remove(self):
+        t = Temperature("20C")
+        self.index.add(t)
+        self.assertTrue(t in self.index)
+        self.assertEquals([repr(t) for t in self.index.range("0C", "30C", (False, False))], ["20C", "300K"])
+        self.index.remove(t)
+        self.assertFalse(t in self.index)
+        self.assertEquals(len(self.index), 7)
+
+    def test_remove_identity(self):  # an equal but different Temperature isn't indexed
+        with self.assertRaises(ValueError):
+            self.index.remove(Temperature("32F"))
+        self.index.remove(self.temps[6])
+        self.assertEquals([repr(t) for t in self.index.range("0C", "0C")], ["0C"])
+
+    def test_add_error(self):
+        with self.assertRaises(TypeError):
+            self.index.add("20C")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import asyncore
+import socket
+import threading
+import time
+import unittest
+from temperature import Temperature
+from temperature_ingest import Ingestor, IngestChannel, IngestServer, BLOCK, DROP_NEWEST, DROP_OLDEST
+
+
+class TestIngestor(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_batches(self):
+        ingestor = Ingestor(batch_size=2, max_wait=0)
+        for line in ["21C", "oops", "70.5F", "300k", "12"]:
+            ingestor.put(line)
+        ingestor.close()
+        batches = [([repr(t) for t in temps], bad) for temps, bad in ingestor.batches()]
+        self.assertEquals(batches, [(["21C"], ["oops"]), (["70.5F", "300K"], []), (["12C"], [])])
+        self.assertEquals((ingestor.received, ingestor.parsed, ingestor.bad), (5, 4, 1))
+
+    def test_readings(self):
+        ingestor = Ingestor()
+        producer = threading.Thread(target=lambda: [ingestor.put("{0}k".format(i)) for i in range(100)]
+                                    + [ingestor.close()])
+        producer.start()
+        self.assertEquals([t.value for t in ingestor.readings()], range(100))
+        producer.join()
+
+    def test_backpressure_block(self):
+        ingestor = Ingestor(maxsize=2)
+        self.assertTrue(ingestor.put("1c"))
+        self.assertTrue(ingestor.put("2c"))
+        self.assertFalse(ingestor.put("3c", block=False))
+        self.assertFalse(ingestor.put("3c", timeout=0.01))
+        self.assertEquals(ingestor.received, 2)
+        self.assertEquals(len(ingestor.get_batch()[0]), 2)
+
+    def test_drop_newest(self):
+        ingestor = Ingestor(maxsize=2, policy=DROP_NEWEST, max_wait=0)
+        results = [ingestor.put(line) for line in ["1c", "2c", "3c"]]
+        self.assertEquals(results, [True, True, False])
+        self.assertEquals([t.value for t in ingestor.get_batch()[0]], [1, 2])
+        self.assertEquals(ingestor.dropped, 1)
+
+    def test_drop_oldest(self):
+        ingestor = Ingestor(maxsize=2, policy=DROP_OLDEST, max_wait=0)
+        results = [ingestor.put(line) for line in ["1c", "2c", "3c"]]
+        self.assertEquals(results, [True, True, True])
+        self.assertEquals([t.value for t in ingestor.get_batch()[0]], [2, 3])
+        self.assertEquals(ingestor.dropped, 1)
+
+    def test_drop_oldest_same_line(self):
+        ingestor = Ingestor(maxsize=3, policy=DROP_OLDEST, max_wait=0)
+        line = "21C"
+        self.assertEquals([ingestor.put(line) for i in range(6)], [True] * 6)
+        self.assertEquals(ingestor.dropped, 3)
+        self.assertEquals(len(ingestor.get_batch()[0]), 3)
+
+    def test_timeout(self):
+        self.assertEquals(Ingestor().get_batch(timeout=0.01), ([], []))
+
+    def test_closed(self):
+        ingestor = Ingestor()
+        ingestor.close()
+        self.assertEquals(ingestor.get_batch(), None)
+        with self.assertRaises(ValueError):
+            ingestor.put("1c")
+
+    def test_close_full(self):  # close() never waits for room, and consumers still drain then stop
+        for policy in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            ingestor = Ingestor(maxsize=2, policy=policy, max_wait=0)
+            ingestor.put("1c")
+            ingestor.put("2c")
+            ingestor.close()
+            self.assertEquals([[t.value for t in temps] for temps, bad in ingestor.batches()], [[1, 2]])
+
+    def test_close_wakes(self):
+        ingestor = Ingestor(maxsize=1)
+        ingestor.put("1c")
+        results = []
+        producer = threading.Thread(target=lambda: results.append(ingestor.put("2c")))
+        producer.daemon = True
+        producer.start()
+        time.sleep(0.05)
+        ingestor.close()
+        producer.join(1)
+        self.assertEquals(results, [False])
+        consumer = threading.Thread(target=lambda: results.append(list(ingestor.readings())))
+        consumer.daemon = True
+        consumer.start()
+        consumer.join(1)
+        self.assertEquals(len(results[1]), 1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Ingestor(policy="wait")
+        with self.assertRaises(ValueError):
+            Ingestor(maxsize=0)
+
+
+class TestIngestChannel(unittest.TestCase):
+    def setUp(self):
+        self.map = {}
+        self.sensor, sock = socket.socketpair()  # the sensor end stands in for a remote sensor
+        self.ingestor = Ingestor(maxsize=3, max_wait=0)
+        self.channel = IngestChannel(sock, self.ingestor, self.map)
+
+    def tearDown(self):
+        self.sensor.close()
+        self.channel.close()
+
+    def poll(self, times=5):
+        for i in range(times):
+            asyncore.loop(timeout=0.01, map=self.map, count=1)
+
+    def test_lines(self):
+        self.sensor.sendall("21C\n70")
+        self.poll()
+        self.sensor.sendall(".5F\n\nbad\n")
+        self.poll()
+        temps, bad = self.ingestor.get_batch()
+        self.assertEquals([repr(t) for t in temps], ["21C", "70.5F"])
+        self.assertEquals(bad, ["bad"])
+
+    def test_backpressure(self):  # a full ingestor stops the channel reading
+        self.sensor.sendall("".join("{0}c\n".format(i) for i in range(10)))
+        self.poll()
+        self.assertTrue(self.ingestor.full())
+        self.assertFalse(self.channel.readable())
+        values = []
+        while len(values) < 10:
+            values.extend(t.value for t in self.ingestor.get_batch()[0])
+            self.poll(1)
+        self.assertEquals(values, range(10))
+
+    def test_close_flushes(self):
+        self.sensor.sendall("1c\n2c\n3c\n4c\n5c")  # the last line has no newline
+        self.sensor.close()
+        self.poll()
+        values = []
+        while self.map or self.ingestor.qsize():
+            values.extend(t.value for t in self.ingestor.get_batch(timeout=0.01)[0])
+            self.poll(1)
+        self.assertEquals(values, [1, 2, 3, 4, 5])
+
+
+class TestIngestServer(unittest.TestCase):
+    def test_1(self):
+        map = {}
+        ingestor = Ingestor()
+        server = IngestServer(("127.0.0.1", 0), ingestor, map)
+        sensors = [socket.create_connection(server.address) for i in range(3)]
+        for i, sensor in enumerate(sensors):
+            sensor.sendall("{0}k\n".format(i))
+        received = []
+        while len(received) < 3:
+            asyncore.loop(timeout=0.01, map=map, count=1)
+            received.extend(t.value for t in ingestor.get_batch(timeout=0.01)[0])
+        self.assertEquals(sorted(received), [0, 1, 2])
+        for sensor in sensors:
+            sensor.close()
+        asyncore.close_all(map)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from StringIO import StringIO
+from temperature import Temperature
+from temperature_io import CsvConverter, TemperatureFormatter, convert_column, iter_chunks
+
+
+class TestIterChunks(unittest.TestCase):
+    def test_1(self):
+        self.assertEquals(list(iter_chunks(xrange(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_2(self):
+        self.assertEquals(list(iter_chunks([], 2)), [])
+
+
+class TestConvertColumn(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_1(self):
+        rows = [["a", "100c"], ["b", "32.F"], ["c", "oops"], ["d", "0"], ["e"]]
+        bad = convert_column(rows, 1, "f")
+        self.assertEquals(bad, [2, 4])
+        self.assertEquals(rows, [["a", "212.0F"], ["b", "32.0F"], ["c", "oops"], ["d", "32.0F"], ["e"]])
+
+    def test_2(self):  # matches str(Temperature) with the same display scale
+        rows = [["37c"], ["-40.5F"], ["300K"]]
+        convert_column(rows, 0, "k")
+        for row, s in zip(rows, ["37c", "-40.5F", "300K"]):
+            t = Temperature(s)
+            t.dscale = "k"
+            self.assertEquals(row[0], str(t))
+
+
+class TestCsvConverter(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_by_name(self):
+        src = StringIO("time,temp\r\n1,0c\r\n2,100C\r\n3,bad\r\n4,273.15k\r\n")
+        dst = StringIO()
+        progress = []
+        bad = []
+        converter = CsvConverter("temp", "F", chunk_size=2, progress=lambda *args: progress.append(args[:2]),
+                                 bad_row=lambda index, row: bad.append((index, row)))
+        self.assertEquals(converter.convert(src, dst), 4)
+        self.assertEquals(dst.getvalue(), "time,temp\r\n1,32.0F\r\n2,212.0F\r\n3,bad\r\n4,32.0F\r\n")
+        self.assertEquals(converter.bad_rows, 1)
+        self.assertEquals(bad, [(2, ["3", "bad"])])
+        self.assertEquals(progress, [(2, 0), (4, 1)])
+
+    def test_by_index_no_header(self):
+        src = StringIO("0c,x\r\n10k,y\r\n")
+        dst = StringIO()
+        converter = CsvConverter(0, "k", header=False)
+        converter.convert(src, dst)
+        self.assertEquals(dst.getvalue(), "273.15K,x\r\n10K,y\r\n")
+
+    def test_iter_chunks(self):
+        src = StringIO("temp\r\n" + "1c\r\n" * 5)
+        chunks = list(CsvConverter("temp", "c", chunk_size=2).iter_chunks(src))
+        self.assertEquals([len(chunk) for chunk in chunks], [1, 2, 2, 1])
+
+    def test_empty(self):
+        dst = StringIO()
+        self.assertEquals(CsvConverter("temp", "c").convert(StringIO(""), dst), 0)
+        self.assertEquals(dst.getvalue(), "")
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            CsvConverter("temp", "c").convert(StringIO("a,b\r\n"), StringIO())
+
+    def test_invalid_scale(self):
+        with self.assertRaises(ValueError):
+            CsvConverter("temp", "x")
+        with self.assertRaises(TypeError):
+            CsvConverter("temp", 1)
+
+    def test_name_requires_header(self):
+        with self.assertRaises(ValueError):
+            CsvConverter("temp", "c", header=False)
+
+
+class TestTemperatureFormatter(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        self.temps = [Temperature("100C"), Temperature("32.5F"), Temperature(0.1 + 0.2)]
+        self.temps[1].dscale = "k"
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_like_str(self):
+        formatter = TemperatureFormatter(chunk_size=2)
+        self.assertEquals(formatter.format(self.temps), "".join(str(t) + "\n" for t in self.temps))
+        self.assertEquals(formatter.rows, 3)
+
+    def test_scale_and_precision(self):
+        self.assertEquals(TemperatureFormatter("f", precision=2, sep=",").format(self.temps), "212.00F,32.50F,32.54F,")
+        self.assertEquals(TemperatureFormatter("K", precision=0).format(self.temps[:1]), "373K\n")
+        self.assertEquals(TemperatureFormatter(sep="%").format(self.temps[:1]), "100C%")
+
+    def test_columns(self):
+        values, codes, bad = Temperature.parse_many(["100C", "32F", "x", "300.5k"])
+        out = StringIO()
+        formatter = TemperatureFormatter(precision=1)
+        self.assertEquals(formatter.write_columns(values, codes, out), 3)
+        self.assertEquals(out.getvalue(), "100.0C\n32.0F\n300.5K\n")
+        out = StringIO()
+        TemperatureFormatter().write_columns(values, codes, out, dcodes=[1, 0, 2])
+        self.assertEquals(out.getvalue(), "212.0F\n0C\n300.5K\n")
+        with self.assertRaises(ValueError):
+            formatter.write_columns(values, codes[:1], out)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            TemperatureFormatter("x")
+        with self.assertRaises(ValueError):
+            TemperatureFormatter(precision=-1)
+        with self.assertRaises(ValueError):
+            TemperatureFormatter(chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import temperature
+import temperature_metrics
+from temperature import Temperature
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        temperature_metrics.reset()
+
+    def tearDown(self):
+        temperature_metrics.disable()
+        temperature_metrics.reset()
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_counters(self):
+        temperature_metrics.enable()
+        self.assertTrue(temperature_metrics.enabled())
+        for line in ["3", "3.5", "10f", " 1.5K ", "x"]:
+            try:
+                Temperature(line)
+            except ValueError:
+                pass
+        t = Temperature("100c")
+        t.dscale = "f"
+        self.assertEquals(t.dvalue, 212.0)
+        t + Temperature("1c")
+        t + 1
+        t - Temperature("1k")
+        snapshot = temperature_metrics.snapshot()
+        self.assertEquals(snapshot["parse"], {"int": 1, "float": 1, "suffixed": 5, "error": 1})
+        self.assertEquals(snapshot["arithmetic"], {"add": 2, "sub": 1, "sub.mixed": 1})
+        self.assertEquals(snapshot["conversions"]["c2f"], 1)
+        self.assertEquals(snapshot["conversions"]["c2k"], 1)  # the mixed subtraction's Kelvin fallback
+
+    def test_sampling_and_callback(self):
+        samples = []
+        temperature_metrics.enable(sample_every=2, callback=lambda name, seconds: samples.append(name))
+        for i in range(5):
+            Temperature(i).kelvin
+        self.assertEquals(samples, ["c2k", "c2k"])
+        self.assertEquals(temperature_metrics.snapshot()["latency"]["c2k"][0], 2)
+        with self.assertRaises(ValueError):
+            temperature_metrics.enable(sample_every=0)
+
+    def test_disable_restores(self):
+        conversions = dict(temperature._CONVERSIONS)
+        add = Temperature.__dict__["__add__"]
+        parse = temperature._parse
+        temperature_metrics.enable()
+        temperature_metrics.enable()  # again, must not wrap twice
+        Temperature("1f").kelvin
+        temperature_metrics.disable()
+        self.assertEquals(temperature._CONVERSIONS, conversions)
+        self.assertTrue(Temperature.__dict__["__add__"] is add)
+        self.assertTrue(temperature._parse is parse)
+        Temperature("1f").kelvin
+        self.assertEquals(temperature_metrics.snapshot()["conversions"], {"f2k": 1})
+        temperature_metrics.reset()
+        self.assertEquals(temperature_metrics.snapshot(),
+                          {"conversions": {}, "parse": {}, "arithmetic": {}, "latency": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from temperature import Temperature
+from temperature_parallel import ParallelConverter, convert_chunk, convert_many
+
+
+class TestConvertChunk(unittest.TestCase):
+    def test_1(self):
+        values, bad = convert_chunk(["0c", "x", "32F", "100"], "K", "C")
+        self.assertEquals(values, [273.15, 273.15, 373.15])
+        self.assertEquals(bad, [1])
+
+    def test_2(self):
+        values, bad = convert_chunk(["212f", "0c", "-40C"], "c", "C", sort=True)
+        self.assertEquals(values, [-40, 0, 100])
+
+
+class TestParallelConverter(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+        self.lines = ["{0}{1}".format(i % 50, "CFK"[i % 3]) for i in range(100)]
+        self.lines[7] = "bad"
+        self.lines[55] = ""
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def expected(self, scale):
+        values = []
+        for line in self.lines:
+            try:
+                t = Temperature(line)
+            except ValueError:
+                continue
+            t.dscale = scale
+            values.append(t.dvalue)
+        return values
+
+    def test_in_process(self):
+        values, bad = convert_many(self.lines, "f", chunk_size=8, workers=1)
+        self.assertEquals(values, self.expected("F"))
+        self.assertEquals(bad, [7, 55])
+
+    def test_pool(self):
+        with ParallelConverter("K", chunk_size=8, workers=2) as converter:
+            values, bad = converter.convert(iter(self.lines))
+            self.assertEquals(values, self.expected("K"))
+            self.assertEquals(bad, [7, 55])
+            values, bad = converter.convert(self.lines, sort=True)
+            self.assertEquals(values, sorted(self.expected("K")))
+
+    def test_default_scale(self):  # workers follow the caller's default scale
+        Temperature.set_default_scale("k")
+        values, bad = convert_many("10\n20", "k", workers=2)
+        self.assertEquals(values, [10, 20])
+
+    def test_iter_chunks(self):
+        converter = ParallelConverter("C", chunk_size=40, workers=1)
+        chunks = list(converter.iter_chunks(self.lines))
+        self.assertEquals([len(values) for values, bad in chunks], [39, 39, 20])
+        self.assertEquals([bad for values, bad in chunks], [[7], [55], []])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ParallelConverter("x")
+        with self.assertRaises(TypeError):
+            ParallelConverter(None)
+        with self.assertRaises(ValueError):
+            ParallelConverter("c", chunk_size=0)
+        with self.assertRaises(ValueError):
+            ParallelConverter("c", workers=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from temperature import Temperature
+from temperature_series import TemperatureSeries
+
+
+class TestTemperatureSeries(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_append(self):
+        series = TemperatureSeries([(0, Temperature("0C")), (1, Temperature("212F"))])
+        series.append(1, 300, "k")
+        series.append(2.5, 10)
+        self.assertEquals(len(series), 4)
+        self.assertEquals(list(series.times), [0, 1, 1, 2.5])
+        for value, expected in zip(series.values(), [0, 100, 26.85, 10]):
+            self.assertAlmostEquals(value, expected)
+        self.assertAlmostEquals(series.values("K")[0], 273.15)
+        time, t = series[0]
+        self.assertEquals((time, str(t)), (0, "0.0C"))
+        series.dscale = "f"
+        self.assertEquals(str(series[-1][1]), "50.0F")
+
+    def test_append_errors(self):
+        series = TemperatureSeries([(5, 1)])
+        with self.assertRaises(ValueError):
+            series.append(4, 1)
+        with self.assertRaises(TypeError):
+            series.append(6, "1C")
+        with self.assertRaises(ValueError):
+            series.dscale = "x"
+        self.assertEquals(len(series), 1)
+
+    def test_between(self):
+        series = TemperatureSeries((time, time) for time in range(10))
+        part = series.between(2, 5)
+        self.assertEquals(list(part.times), [2, 3, 4])
+        self.assertEquals(part.dscale, "C")
+
+    def test_resample(self):
+        series = TemperatureSeries([(0, 1), (10, 5), (59, 3), (60, 7), (200, 2), (201, 4)], dscale="C")
+        self.assertEquals(list(series.resample(60, "min").times), [0, 60, 180])
+        for how, expected in [("min", [1, 7, 2]), ("max", [5, 7, 4]), ("mean", [3, 7, 3]), ("last", [3, 7, 4])]:
+            for value, e in zip(series.resample(60, how).values(), expected):
+                self.assertAlmostEquals(value, e)
+        self.assertEquals(list(series.resample(60, origin=30).times), [-30, 30, 150])
+        self.assertEquals(len(TemperatureSeries().resample(60)), 0)
+        with self.assertRaises(ValueError):
+            series.resample(0)
+        with self.assertRaises(ValueError):
+            series.resample(60, "median")
+
+    def test_rolling(self):
+        rnd = random.Random(5)
+        samples = []
+        time = 0
+        for i in range(300):
+            time += rnd.choice([0, 0.5, 1, 3])
+            samples.append((time, rnd.uniform(-20, 40)))
+        series = TemperatureSeries(samples)
+        window = 4
+        for how, aggregate in [("min", min), ("max", max), ("mean", lambda v: sum(v) / len(v)),
+                               ("last", lambda v: v[-1])]:
+            rolled = series.rolling(window, how)
+            self.assertEquals(list(rolled.times), list(series.times))
+            for index, result in enumerate(rolled.values()):
+                time = samples[index][0]
+                expected = aggregate([v for t, v in samples[:index + 1] if t > time - window])
+                self.assertAlmostEquals(result, expected)
+        with self.assertRaises(ValueError):
+            series.rolling(-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
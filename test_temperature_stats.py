@@ -0,0 +1,137 @@
+import bisect
+import math
+import random
+import unittest
+from temperature import Temperature
+from temperature_stats import QuantileSketch, RunningStats
+
+
+class TestRunningStats(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_empty(self):
+        stats = RunningStats()
+        self.assertEquals(stats.count, 0)
+        self.assertEquals(stats.min(), None)
+        self.assertEquals(stats.mean("C"), None)
+        self.assertEquals(stats.variance(), None)
+        self.assertEquals(stats.stddev(ddof=1), None)
+
+    def test_mixed_scales(self):
+        stats = RunningStats([Temperature("0c"), Temperature("212F")])
+        stats.add(323.15, "k")
+        stats.add(25)  # default scale
+        self.assertEquals(stats.count, 4)
+        self.assertAlmostEquals(stats.min("C"), 0)
+        self.assertAlmostEquals(stats.max("F"), 212)
+        self.assertAlmostEquals(stats.mean("C"), 43.75)
+        self.assertAlmostEquals(stats.mean(), 316.9)
+
+    def test_variance(self):
+        values = [10, 20, 30, 40]
+        stats = RunningStats([Temperature(v) for v in values])
+        self.assertAlmostEquals(stats.variance("C"), 125)
+        self.assertAlmostEquals(stats.variance("k", ddof=1), 500 / 3.0)
+        self.assertAlmostEquals(stats.stddev("F"), math.sqrt(125) * 1.8)
+
+    def test_merge(self):
+        rnd = random.Random(3)
+        temps = [Temperature("{0}{1}".format(rnd.uniform(-50, 50), rnd.choice("CFK"))) for i in range(200)]
+        whole = RunningStats(temps)
+        parts = [RunningStats(temps[:70]), RunningStats(temps[70:71]), RunningStats(), RunningStats(temps[71:])]
+        merged = RunningStats()
+        for part in parts:
+            merged.merge(part)
+        self.assertEquals(merged.count, 200)
+        self.assertEquals(merged.min(), whole.min())
+        self.assertEquals(merged.max(), whole.max())
+        self.assertAlmostEquals(merged.mean(), whole.mean())
+        self.assertAlmostEquals(merged.variance(), whole.variance())
+
+    def test_errors(self):
+        stats = RunningStats()
+        with self.assertRaises(TypeError):
+            stats.add("20C")
+        with self.assertRaises(ValueError):
+            stats.add(20, "x")
+        with self.assertRaises(TypeError):
+            stats.merge(None)
+        stats.add(1)
+        with self.assertRaises(ValueError):
+            stats.mean("x")
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def setUp(self):
+        self.__oldDefaultScale = Temperature.DEFAULT_SCALE
+        Temperature.set_default_scale("C")
+
+    def tearDown(self):
+        Temperature.set_default_scale(self.__oldDefaultScale)
+
+    def test_empty(self):
+        sketch = QuantileSketch()
+        self.assertEquals(sketch.count, 0)
+        self.assertEquals(sketch.quantiles([0, 0.5]), [None, None])
+        self.assertEquals(sketch.rank(1), None)
+        self.assertEquals(sketch.histogram([1, 2]), [0, 0, 0])
+        self.assertEquals(sketch.min(), None)
+
+    def test_small_is_exact(self):
+        sketch = QuantileSketch([Temperature("0C"), Temperature("212F")])
+        sketch.add(300, "k")
+        sketch.add(10)
+        self.assertAlmostEquals(sketch.quantile(0, "C"), 0)
+        self.assertAlmostEquals(sketch.quantile(0.5, "C"), 10)
+        self.assertAlmostEquals(sketch.quantile(0.75, "C"), 26.85)
+        self.assertAlmostEquals(sketch.quantile(1, "F"), 212)
+        self.assertEquals(sketch.rank(Temperature("10C")), 0.5)
+        self.assertEquals(sketch.histogram([5, 50, 100], "C"), [1, 2, 0, 1])
+
+    def test_error_bound(self):
+        rnd = random.Random(7)
+        values = [rnd.gauss(20, 10) for i in range(50000)]
+        sketch = QuantileSketch(seed=1)
+        sketch.add_many(values, "C")
+        self.assertTrue(sum(len(level) for level in sketch._QuantileSketch__compactors) < 1000)
+        ordered = sorted(values)
+        for q, value in zip([0.01, 0.5, 0.95, 0.99], sketch.quantiles([0.01, 0.5, 0.95, 0.99], "C")):
+            true_rank = bisect.bisect_left(ordered, value) / float(len(ordered))
+            self.assertTrue(abs(true_rank - q) < 0.01, (q, true_rank))
+        self.assertAlmostEquals(sketch.min("C"), ordered[0])
+        self.assertAlmostEquals(sketch.max("C"), ordered[-1])
+        counts = sketch.histogram([0, 20, 40], "C")
+        self.assertEquals(sum(counts), 50000)
+        self.assertTrue(abs(counts[1] - sum(1 for v in values if 0 <= v < 20)) < 500)
+
+    def test_merge(self):
+        rnd = random.Random(3)
+        values = [rnd.uniform(-50, 50) for i in range(20000)]
+        merged = QuantileSketch(seed=2)
+        for i in range(0, 20000, 3000):
+            merged.merge(QuantileSketch((Temperature(v) for v in values[i:i + 3000]), seed=i))
+        merged.merge(QuantileSketch())
+        self.assertEquals(merged.count, 20000)
+        ordered = sorted(values)
+        median = merged.quantile(0.5, "C")
+        self.assertTrue(abs(bisect.bisect_left(ordered, median) / 20000.0 - 0.5) < 0.01)
+
+    def test_errors(self):
+        sketch = QuantileSketch([1])
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+        with self.assertRaises(ValueError):
+            sketch.histogram([2, 1])
+        with self.assertRaises(TypeError):
+            sketch.merge(None)
+        with self.assertRaises(ValueError):
+            QuantileSketch(k=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import unittest
+from temperature import Temperature
+from temperature_store import TemperatureFile, TemperatureWriter, pack_batch, unpack_batch, write
+
+
+class TestTemperatureStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "readings.tser")
+        self.temps = [Temperature(s) for s in ["10.5f", "-3c", "300K", "0.0c", "98765k"]]
+        self.temps[1].dscale = "F"
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        self.assertEquals(write(self.path, self.temps), 5)
+        with TemperatureFile(self.path) as series:
+            self.assertEquals(len(series), 5)
+            self.assertFalse(series.has_dscale)
+            self.assertEquals([repr(t) for t in series], ["10.5F", "-3C", "300K", "0.0C", "98765K"])
+            self.assertEquals([type(t.value) for t in series], [float, int, int, float, int])
+            self.assertEquals(series[1].dscale, "C")
+
+    def test_dscale(self):
+        write(self.path, self.temps, dscale=True)
+        with TemperatureFile(self.path) as series:
+            self.assertTrue(series.has_dscale)
+            self.assertEquals([t.dscale for t in series], ["F", "F", "K", "C", "K"])
+            self.assertEquals(str(series[1]), str(self.temps[1]))
+
+    def test_random_access(self):
+        with TemperatureWriter(self.path, buffer_size=3) as writer:
+            for i in range(1000):
+                writer.write(Temperature("{0}{1}".format(i, "CFK"[i % 3])))
+        with TemperatureFile(self.path) as series:
+            self.assertEquals(repr(series[500]), "500K")
+            self.assertEquals(repr(series[-1]), "999C")
+            self.assertEquals([repr(t) for t in series[10:13]], ["10F", "11K", "12C"])
+            self.assertEquals([repr(t) for t in series[998:2000]], ["998K", "999C"])
+            with self.assertRaises(IndexError):
+                series[1000]
+
+    def test_columns(self):
+        write(self.path, self.temps, dscale=True)
+        with TemperatureFile(self.path) as series:
+            self.assertEquals(list(series.values), [10.5, -3, 300, 0, 98765])
+            self.assertEquals(list(series.codes), [1, 0x80, 0x82, 0, 0x82])
+            self.assertEquals(list(series.dcodes), [1, 1, 2, 0, 2])
+            a = series.to_array(1, 3)
+            self.assertEquals(repr(a), "TemperatureArray([-3.0C, 300.0K])")
+            self.assertEquals(a.dscale, ["F", "K"])
+        write(self.path, self.temps)
+        with TemperatureFile(self.path) as series:
+            self.assertEquals(list(series.dcodes), [1, 0, 2, 0, 2])
+            self.assertEquals(series.dcodes.dtype, series.codes.dtype)
+
+    def test_views_outlive_close(self):
+        write(self.path, self.temps)
+        with TemperatureFile(self.path) as series:
+            values = series.values
+            codes = series.codes
+        self.assertEquals(values[:3].sum(), 307.5)
+        self.assertEquals(list(codes), [1, 0x80, 0x82, 0, 0x82])
+        with self.assertRaises(ValueError):
+            series.values
+        with self.assertRaises(ValueError):
+            series[0]
+
+    def test_empty(self):
+        write(self.path, [])
+        with TemperatureFile(self.path) as series:
+            self.assertEquals(len(series), 0)
+            self.assertEquals(list(series), [])
+            self.assertEquals(len(series.values), 0)
+
+    def test_not_a_series(self):
+        with open(self.path, "wb") as f:
+            f.write("x" * 64)
+        with self.assertRaises(ValueError):
+            TemperatureFile(self.path)
+
+    def test_truncated(self):
+        write(self.path, self.temps)
+        with open(self.path, "r+b") as f:
+            f.truncate(40)
+        with self.assertRaises(ValueError):
+            TemperatureFile(self.path)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temps = [Temperature(s) for s in ["10.5f", "-3c", "300K", "0.1c", str(2 ** 62) + "k", "1e300"]]
+
+    def fields(self, temps):
+        return [(t.value, type(t.value), t.scale, t.dscale) for t in temps]
+
+    def test_round_trip(self):
+        data = pack_batch(self.temps)
+        self.assertEquals(len(data), 12 + 6 * 9)
+        self.assertEquals(self.fields(unpack_batch(data)), self.fields(self.temps))
+        self.temps[1].dscale = "d"
+        data = pack_batch(self.temps)
+        self.assertEquals(len(data), 12 + 6 * 10)
+        self.assertEquals(self.fields(unpack_batch(data)), self.fields(self.temps))
+        self.assertEquals(unpack_batch(pack_batch([])), [])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            pack_batch([Temperature(str(2 ** 64) + "K")])
+        data = pack_batch(self.temps)
+        for bad in [data[:-1], data[:5], "XXXX" + data[4:], data[:4] + "\x09" + data[5:]]:
+            with self.assertRaises(ValueError):
+                unpack_batch(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()